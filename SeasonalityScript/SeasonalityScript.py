@@ -1,12 +1,536 @@
+import csv
 import json
-import requests
+import logging
 import pandas as pd
 import numpy as np
 import os
 from datetime import datetime, timedelta
+from functools import cached_property, lru_cache
+from .instrumentation import log, stage
+from .nager import NagerClient
+from .providers import DAYS, HolidayProvider
+MONTHS = ["January", "February", "March", "April", "May", "June", 
+          "July", "August", "September", "October", "November", "December"]
+
+# Number of date ranges whose weeks and weekly and monthly dummies are kept in memory
+CALENDAR_CACHE_SIZE = 32
+
+# How daily variables are converted to weekly. Bank holidays are summed ('sum', the number of holiday days of
+# the week) or flagged ('max'), and a week gets the ISO week, month or quarter that covers more than 'threshold' of its days
+AGGREGATION = {"holidays": "sum", "threshold": 3}
+
+def aggregation_rules(aggregation: dict = None):
+    '''
+    :param aggregation: dict | rules that replace the ones in AGGREGATION (e.g. {"holidays": "max"}).
+
+    :returns: dict | the aggregation rules.
+    '''
+    rules = {**AGGREGATION, **(aggregation or {})}
+    if set(rules) != set(AGGREGATION) or rules["holidays"] not in ["sum", "max"] or not 0 <= rules["threshold"] < 7:
+        raise ValueError(f"aggregation should set 'holidays' ('sum' or 'max') and 'threshold' (0 to 6), not {aggregation!r}")
+    return rules
+
+def weekday(dates):
+    '''
+    :param dates: numpy.datetime64 | dates with a daily unit.
+
+    :returns: numpy.ndarray | day of the week of each date, where Monday is 0 (1970-01-01 was a Thursday).
+    '''
+    return (dates.astype("int64") + 3) % 7
+
+@lru_cache(maxsize= CALENDAR_CACHE_SIZE)
+def week_bins(start_date, end_date, day: str, week_ending: bool = False):
+    '''
+    Computes the weeks the daily data is converted to, matching resample(f"W-{day}").
+
+    Every stage converts its variables with the same weeks, so the last CALENDAR_CACHE_SIZE results are kept.
+    The arrays returned are read-only.
+
+    :param start_date: pandas.Timestamp | first date in the dataset.
+    :param end_date: pandas.Timestamp | last date in the dataset.
+    :param day: str | the first day of the week (i.e. SUN or MON or TUE...)
+    :param week_ending: bool | weeks are labeled by their last day instead of their first one. False by default.
+
+    :returns: tuple | week labels (pandas.DatetimeIndex), and the first and last day of each week inside the date range (numpy.datetime64).
+    '''
+    anchor = DAYS.index(day.upper())
+    start = np.datetime64(pd.Timestamp(start_date).date(), "D")
+    end = np.datetime64(pd.Timestamp(end_date).date(), "D")
+
+    if week_ending == False:
+        first_label = start - (weekday(start) - anchor) % 7
+        last_label = end - (weekday(end) - anchor) % 7
+    else:
+        first_label = start + (anchor - weekday(start)) % 7
+        last_label = end + (anchor - weekday(end)) % 7
+
+    labels = np.arange(first_label, last_label + 1, 7, dtype= "datetime64[D]")
+    if week_ending == False:
+        first, last = labels, labels + 6
+    else:
+        first, last = labels - 6, labels
+
+    # Builds the labels the same way build_dataframe builds the dates, so they share the same dtype
+    offset = pd.Timedelta(days= int((first_label - start).astype("int64")))
+    dates = pd.date_range(start= pd.Timestamp(start_date) + offset, periods= len(labels), freq= "7D", name= "date")
+    (first, last) = (np.maximum(first, start), np.minimum(last, end))
+    first.flags.writeable = False
+    last.flags.writeable = False
+    return dates, first, last
+
+def majority_dummies(first, last, period, size: int, threshold: int = 3):
+    '''
+    Builds 0/1 dummies flagging, for every week, the periods that cover more than threshold of its days.
+
+    Periods are at least a week long, so a week only overlaps the period its first day falls in
+    and the one its last day falls in.
+
+    :param first: numpy.ndarray | first day of each week.
+    :param last: numpy.ndarray | last day of each week.
+    :param period: function | receives days and returns the first day, last day and column (0 based) of the period each one falls in.
+    :param size: int | number of dummy columns.
+    :param threshold: int | days of the week a period needs to cover. 3 by default.
+
+    :returns: numpy.ndarray | integer matrix with one row per week and one column per period.
+    '''
+    matrix = np.zeros((len(first), size), dtype= np.int64)
+    for days in (first, last):
+        (period_start, period_end, codes) = period(days)
+        overlap = (np.minimum(last, period_end) - np.maximum(first, period_start)).astype("int64") + 1
+        rows = np.flatnonzero(overlap > threshold)
+        matrix[rows, codes[rows]] = 1
+    return matrix
+
+def iso_weeks(days):
+    '''
+    :returns: tuple | Monday and Sunday of the ISO week each day falls in, and the number of the week minus 1.
+    '''
+    monday = days - weekday(days)
+    weeks = pd.DatetimeIndex(monday + 3).isocalendar().week.to_numpy(dtype= np.int64)
+    return monday, monday + 6, weeks - 1
+
+def months(days):
+    '''
+    :returns: tuple | first and last day of the month each day falls in, and the month minus 1.
+    '''
+    month = days.astype("datetime64[M]")
+    return month.astype("datetime64[D]"), (month + 1).astype("datetime64[D]") - 1, month.view("int64") % 12
+
+@lru_cache(maxsize= CALENDAR_CACHE_SIZE)
+def weekly_dummies(start_date, end_date, day: str, week_ending: bool = False, threshold: int = 3):
+    '''
+    Builds the weekly dummies straight from the week boundaries. A week gets the ISO week that covers more than threshold (3) of its days.
+
+    The dummies only depend on the dates and week settings, so the last CALENDAR_CACHE_SIZE results are
+    kept and shared by every object. Don't modify the DataFrame returned, copy it instead.
+
+    :param start_date: pandas.Timestamp | first date in the dataset.
+    :param end_date: pandas.Timestamp | last date in the dataset.
+    :param day: str | the first day of the week (i.e. SUN or MON or TUE...)
+    :param week_ending: bool | converts data from daily to week ending. False by default.
+    :param threshold: int | days of the week an ISO week needs to cover. 3 by default.
+
+    :returns: pandas.DataFrame | 'date' column and one 0/1 column per ISO week.
+    '''
+    dates, first, last = week_bins(start_date, end_date, day, week_ending)
+    matrix = majority_dummies(first, last, iso_weeks, 53, threshold)
+
+    df = pd.DataFrame(matrix, columns= [f"Seasonality-Week-Week {i}" for i in range(1, 54)])
+    df.insert(0, "date", dates)
+    return df
+
+@lru_cache(maxsize= CALENDAR_CACHE_SIZE)
+def monthly_dummies(start_date, end_date, day: str, week_ending: bool = False, threshold: int = 3):
+    '''
+    Builds the monthly dummies straight from the week boundaries. A week gets the month that covers more than threshold (3) of its days.
+
+    Results are kept and shared like the ones from weekly_dummies. Don't modify the DataFrame returned, copy it instead.
+
+    :param start_date: pandas.Timestamp | first date in the dataset.
+    :param end_date: pandas.Timestamp | last date in the dataset.
+    :param day: str | the first day of the week (i.e. SUN or MON or TUE...)
+    :param week_ending: bool | converts data from daily to week ending. False by default.
+    :param threshold: int | days of the week a month needs to cover. 3 by default.
+
+    :returns: pandas.DataFrame | 'date' column and one 0/1 column per month.
+    '''
+    dates, first, last = week_bins(start_date, end_date, day, week_ending)
+    matrix = majority_dummies(first, last, months, 12, threshold)
+
+    df = pd.DataFrame(matrix, columns= [f"Seasonality-{month}" for month in MONTHS])
+    df.insert(0, "date", dates)
+    return df
+
+def aggregate_weeks(start_date, end_date, day: str, week_ending: bool, matrix: np.ndarray, how: list, threshold: int = 3):
+    '''
+    Converts daily variables to weekly in one grouped operation, matching resample(f"W-{day}").
+
+    Every week is a contiguous block of days, so all the columns are summed at once with np.add.reduceat
+    and then turned into the aggregation of each column.
+
+    :param start_date: pandas.Timestamp | first date in the dataset (the first row of the matrix).
+    :param end_date: pandas.Timestamp | last date in the dataset (the last row of the matrix).
+    :param day: str | the first day of the week (i.e. SUN or MON or TUE...)
+    :param week_ending: bool | converts data from daily to week ending. False by default.
+    :param matrix: numpy.ndarray | one row per day and one column per variable.
+    :param how: list | aggregation of each column: 'sum', 'max', 'mean' or 'majority' (1 if more than threshold days are nonzero).
+    :param threshold: int | days a week needs for a 'majority' column to be 1. 3 by default.
+
+    :returns: tuple | week labels (pandas.DatetimeIndex) and the weekly matrix (one row per week).
+    '''
+    (dates, first, last) = week_bins(start_date, end_date, day, week_ending)
+    starts = (first - first[0]).astype("int64")
+    how = np.array(how, dtype= object)
+    if (how == "mean").any():
+        matrix = matrix.astype(np.float64)
+    weekly = np.add.reduceat(matrix, starts, axis= 0) if len(matrix) > 0 else matrix
+
+    if (how == "max").any():
+        weekly[:, how == "max"] = np.maximum.reduceat(matrix[:, how == "max"], starts, axis= 0)
+    if (how == "mean").any():
+        days = (last - first).astype("int64") + 1
+        weekly[:, how == "mean"] = weekly[:, how == "mean"] / days[:, None]
+    if (how == "majority").any():
+        weekly[:, how == "majority"] = weekly[:, how == "majority"] > threshold
+    return dates, weekly
+
+def holiday_days_feature(days, holidays):
+    '''
+    :returns: tuple | 'Holiday Days' column: the number of bank holiday days of each week.
+    '''
+    return ["Seasonality-Holiday Days"], np.isin(days, holidays)[:, None], ["sum"]
+
+def holiday_window_feature(days, holidays, before: int = 1, after: int = 1):
+    '''
+    :param before: int | days before a bank holiday that are flagged. 1 by default.
+    :param after: int | days after a bank holiday that are flagged. 1 by default.
+
+    :returns: tuple | 'Pre Holiday' and 'Post Holiday' columns: the number of days of each week within the window before (or after) a bank holiday.
+    '''
+    # Counts the holidays in (day, day + before] and [day - after, day) with binary searches
+    pre = np.searchsorted(holidays, days + before, side= "right") - np.searchsorted(holidays, days, side= "right")
+    post = np.searchsorted(holidays, days, side= "left") - np.searchsorted(holidays, days - after, side= "left")
+    names = ["Seasonality-Pre Holiday", "Seasonality-Post Holiday"]
+    return names, np.column_stack([pre > 0, post > 0]), ["sum", "sum"]
+
+def payday_feature(days, holidays, days_of_month: list = (15, -1), roll: bool = True):
+    '''
+    :param days_of_month: list | days of the month people get paid. Negative days count from the end of the month (-1 is the last day). (15, -1) by default.
+    :param roll: bool | moves paydays that fall on a weekend to the Friday before. True by default.
+
+    :returns: tuple | 'Payday' column: the number of paydays of each week.
+    '''
+    months = np.arange(days[0].astype("datetime64[M]") - 1, days[-1].astype("datetime64[M]") + 2)
+    month_start = months.astype("datetime64[D]")
+    month_end = (months + 1).astype("datetime64[D]") - 1
+
+    paydays = []
+    for day in days_of_month:
+        payday = month_start + (day - 1) if day > 0 else month_end + (day + 1)
+        paydays.append(np.minimum(np.maximum(payday, month_start), month_end))
+    paydays = np.concatenate(paydays)
+    if roll == True:
+        paydays = paydays - np.maximum(weekday(paydays) - 4, 0)
+    return ["Seasonality-Payday"], np.isin(days, paydays)[:, None], ["sum"]
+
+def month_end_feature(days, holidays, last_days: int = 3):
+    '''
+    :param last_days: int | days at the end of the month that are flagged. 3 by default.
+
+    :returns: tuple | 'Month End' column: the number of days of each week in the last days of a month.
+    '''
+    month_end = (days.astype("datetime64[M]") + 1).astype("datetime64[D]") - 1
+    return ["Seasonality-Month End"], ((month_end - days).astype("int64") < last_days)[:, None], ["sum"]
+
+def quarter_feature(days, holidays):
+    '''
+    :returns: tuple | one 0/1 column per quarter. A week gets the quarter that covers more than 3 of its days.
+    '''
+    quarter = days.astype("datetime64[M]").astype("int64") % 12 // 3
+    return [f"Seasonality-Q{i}" for i in range(1, 5)], quarter[:, None] == np.arange(4), ["majority"] * 4
+
+def fourier_feature(days, holidays, order: int = 2, period: float = 365.25):
+    '''
+    :param order: int | number of sine and cosine pairs. 2 by default.
+    :param period: float | length of the season in days. 365.25 (a year) by default.
+
+    :returns: tuple | 'Fourier Sin k' and 'Fourier Cos k' columns, averaged over the days of each week.
+    '''
+    angle = 2 * np.pi * days.astype("int64")[:, None] * np.arange(1, order + 1) / period
+    names = [f"Seasonality-Fourier {kind} {k}" for k in range(1, order + 1) for kind in ["Sin", "Cos"]]
+    matrix = np.stack([np.sin(angle), np.cos(angle)], axis= 2).reshape(len(days), 2 * order)
+    return names, matrix, ["mean"] * (2 * order)
+
+# Features available in the 'features' parameter, by name
+FEATURES = {"holiday_days": holiday_days_feature, "holiday_window": holiday_window_feature, "payday": payday_feature,
+            "month_end": month_end_feature, "quarter": quarter_feature, "fourier": fourier_feature}
+
+def feature_specs(features: list):
+    '''
+    :param features: list | feature names (e.g. "quarter") or dicts with the 'name' and the parameters of the feature (e.g. {"name": "fourier", "order": 3}).
+
+    :returns: list | (name, parameters) pairs.
+    '''
+    specs = []
+    for feature in features or []:
+        (name, params) = (feature, {}) if isinstance(feature, str) else (feature["name"], {key: value for (key, value) in feature.items() if key != "name"})
+        if name not in FEATURES:
+            raise ValueError(f"Unknown feature {name!r}. Available features: {list(FEATURES)}")
+        specs.append((name, params))
+    return specs
+
+def weekly_features(start_date, end_date, day: str, week_ending: bool, holidays: dict, features: list, threshold: int = 3):
+    '''
+    Computes the requested features in one vectorized pass over the daily dates and converts them to weekly together.
+
+    :param start_date: pandas.Timestamp | first date in the dataset.
+    :param end_date: pandas.Timestamp | last date in the dataset.
+    :param day: str | the first day of the week (i.e. SUN or MON or TUE...)
+    :param week_ending: bool | converts data from daily to week ending. False by default.
+    :param holidays: dict | bank holiday names and the list of dates each one falls on.
+    :param features: list | feature names or dicts with the 'name' and the parameters of the feature.
+    :param threshold: int | days a week needs for a 'majority' column (e.g. a quarter) to be 1. 3 by default.
+
+    :returns: pandas.DataFrame | 'date' column and the columns of every feature. Counts and dummies are integers and averages are floats.
+    '''
+    days = np.arange(np.datetime64(pd.Timestamp(start_date).date(), "D"), np.datetime64(pd.Timestamp(end_date).date(), "D") + 1)
+    holiday_dates = [np.array(dates, dtype= "datetime64[D]") for dates in holidays.values()]
+    holiday_dates = np.unique(np.concatenate(holiday_dates)) if len(holiday_dates) > 0 else np.array([], dtype= "datetime64[D]")
+
+    (names, columns, how) = ([], [], [])
+    for (name, params) in feature_specs(features):
+        (feature_names, matrix, feature_how) = FEATURES[name](days, holiday_dates, **params)
+        names += feature_names
+        columns.append(matrix)
+        how += feature_how
+
+    matrix = np.hstack(columns).astype(np.float64) if len(columns) > 0 else np.zeros((len(days), 0))
+    (dates, weekly) = aggregate_weeks(start_date, end_date, day, week_ending, matrix, how, threshold)
+
+    df = pd.DataFrame(weekly, columns= names)
+    df = df.astype({name: np.int64 for (name, kind) in zip(names, how) if kind != "mean"})
+    df.insert(0, "date", dates)
+    return df
+
+def holiday_columns(holidays: dict):
+    '''
+    Names the bank holiday columns. Holidays that share a name after removing the punctuation
+    are written to the same column, and the last one wins.
+
+    :param holidays: dict | bank holiday names and the list of dates each one falls on.
+
+    :returns: dict | 'Seasonality-' column names, in the order of the holidays, and the dates written to each one.
+    '''
+    columns = {}
+    for (holiday, holiday_dates) in holidays.items():
+        columns['Seasonality-' + holiday.replace("'", '').replace('.', '').replace(',', '')] = holiday_dates
+    return columns
+
+def holiday_indicators(dates: pd.Series, holidays: dict):
+    '''
+    Builds the bank holiday columns for a set of daily dates in one vectorized pass.
+
+    :param dates: pandas.Series | sorted daily dates (datetime64) the columns are built for.
+    :param holidays: dict | bank holiday names and the list of dates each one falls on.
+
+    :returns: pandas.DataFrame | one 0/1 'Seasonality-' column per bank holiday, aligned with the dates.
+    '''
+    days = dates.to_numpy(dtype= "datetime64[D]")
+    columns = holiday_columns(holidays)
+
+    matrix = np.zeros((len(days), len(columns)), dtype= np.int64)
+    for (column, holiday_dates) in enumerate(columns.values()):
+        # Looks up the row of each holiday date instead of scanning all the days
+        holiday_dates = np.array(holiday_dates, dtype= "datetime64[D]")
+        rows = np.searchsorted(days, holiday_dates)
+        found = rows < len(days)
+        found[found] = days[rows[found]] == holiday_dates[found]
+        matrix[rows[found], column] = 1
+
+    return pd.DataFrame(matrix, columns= list(columns), index= dates.index)
+
+def nonzero(values: pd.Series):
+    '''
+    :param values: pandas.Series | dense or sparse column.
+
+    :returns: tuple | positions and values of the nonzero elements. Sparse columns are read without densifying them.
+    '''
+    if isinstance(values.dtype, pd.SparseDtype):
+        rows = values.array.sp_index.indices
+        values = values.array.sp_values
+    else:
+        values = values.to_numpy()
+        rows = np.arange(len(values))
+
+    keep = values != 0
+    return rows[keep], values[keep]
+
+def to_sparse(df: pd.DataFrame):
+    '''
+    :param df: pandas.DataFrame | 'date' column and one column per variable.
+
+    :returns: pandas.DataFrame | copy of the DataFrame where the integer variables are sparse uint8 columns (0 is not stored).
+    '''
+    return df.astype({column: pd.SparseDtype(np.uint8, 0) for column in df.columns
+                      if column != "date" and pd.api.types.is_integer_dtype(df[column])})
+
+def hstack_weeks(frames: list):
+    '''
+    Puts weekly DataFrames side by side. They're all converted with the same weeks, so their rows
+    are already aligned and no merge is needed.
+
+    :param frames: list | DataFrames with the same 'date' column and one column per variable.
+
+    :returns: pandas.DataFrame | the 'date' column and the variables of every DataFrame, in order.
+    '''
+    dates = frames[0]["date"].to_numpy()
+    for frame in frames[1:]:
+        if not np.array_equal(frame["date"].to_numpy(), dates):
+            raise ValueError("The weekly DataFrames don't have the same weeks")
+    return pd.concat([frames[0].reset_index(drop= True)] + [frame.drop(columns= "date").reset_index(drop= True) for frame in frames[1:]], axis= 1)
+
+def sparse_holiday_counts(dates: pd.Series, holidays: dict, day: str, week_ending: bool = False, how: str = "sum"):
+    '''
+    Builds the weekly bank holiday columns as sparse columns, without building the daily columns.
+
+    Produces the same values as holiday_indicators followed by the weekly resample.
+
+    :param dates: pandas.Series | sorted daily dates (datetime64) with no gaps.
+    :param holidays: dict | bank holiday names and the list of dates each one falls on.
+    :param day: str | the first day of the week (i.e. SUN or MON or TUE...)
+    :param week_ending: bool | converts data from daily to week ending. False by default.
+    :param how: str | 'sum' counts the holiday days of each week and 'max' flags the weeks with a holiday. 'sum' by default.
+
+    :returns: pandas.DataFrame | 'date' column and one sparse uint8 'Seasonality-' column per bank holiday.
+    '''
+    (labels, first, last) = week_bins(dates.iloc[0], dates.iloc[-1], day, week_ending)
+
+    # Counts the holiday days of each week by looking up the week each date falls in
+    counts = {}
+    for (column, holiday_dates) in holiday_columns(holidays).items():
+        holiday_dates = np.unique(np.array(holiday_dates, dtype= "datetime64[D]"))
+        holiday_dates = holiday_dates[(holiday_dates >= first[0]) & (holiday_dates <= last[-1])]
+        weeks = np.searchsorted(first, holiday_dates, side= "right") - 1
+        count = np.bincount(weeks, minlength= len(first))
+        if how == "max":
+            count = np.minimum(count, 1)
+        counts[column] = pd.arrays.SparseArray(count.astype(np.uint8), fill_value= 0)
+
+    return pd.DataFrame({"date": labels, **counts})
+
+def preamble_rows(columns: list):
+    '''
+    :param columns: list | headers of the file, including the 'account' and 'date' columns.
+
+    :returns: list | the 8 'Blank' rows and the 'SUB' row the modeling tool expects above the headers.
+    '''
+    return [["Blank"] * len(columns)] * 8 + [[None, None] + ["SUB"] * (len(columns) - 2)]
+
+FILE_FORMATS = {"parquet": ".parquet", "feather": ".feather", "arrow": ".arrow"}
+
+def feature_table(df: pd.DataFrame, long_format: bool = False, nonzero_only: bool = False):
+    '''
+    Converts a weekly DataFrame to an Arrow table with compact types.
+
+    The variables are stored as uint8, or float32 for averages (long format uses a dictionary encoded 'series_name'), and the
+    'account' column and the rows needed by the modeling tool are kept as metadata instead of data.
+
+    :param df: pandas.DataFrame | 'date' column and one column per variable.
+    :param long_format: bool | one row per variable and week instead of one column per variable. False by default.
+    :param nonzero_only: bool | skips the long format rows whose value is 0. False by default.
+
+    :returns: pyarrow.Table | the table, ready to be written.
+    '''
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Parquet, Feather and Arrow files require pyarrow: pip install SeasonalityScript[arrow]") from None
+
+    variables = [column for column in df.columns if column != "date"]
+    dates = df["date"].to_numpy(dtype= "datetime64[D]")
+
+    if long_format == False:
+        table = pa.table({"date": dates, **{column: df[column].to_numpy(dtype= np.uint8 if pd.api.types.is_integer_dtype(df[column]) else np.float32)
+                                            for column in variables}})
+    else:
+        # Averages (e.g. the Fourier terms) make the whole 'value' column float
+        integer = all(pd.api.types.is_integer_dtype(df[column]) for column in variables)
+        values = df[variables].to_numpy(dtype= np.uint8 if integer else np.float32)
+
+        # Variables go one after another, like the long format csv file
+        codes = np.repeat(np.arange(len(variables)), len(df))
+        dates = np.tile(dates, len(variables))
+        values = values.T.ravel()
+        if nonzero_only == True:
+            keep = values != 0
+            (codes, dates, values) = (codes[keep], dates[keep], values[keep])
+
+        series_name = pd.Categorical.from_codes(codes, categories= variables)
+        table = pa.table({"series_name": pa.DictionaryArray.from_pandas(series_name), "date": dates, "value": values})
+
+    metadata = {"account": "national", "preamble": json.dumps(preamble_rows(["account"] + list(df.columns)))}
+    return table.replace_schema_metadata(metadata)
+
+def long_rows(df: pd.DataFrame, *keys, nonzero_only: bool = False):
+    '''
+    Generates the long format rows of a weekly DataFrame, one variable at a time.
+
+    :param df: pandas.DataFrame | 'date' column and one column per variable.
+    :param keys: str | values added at the start of every row (e.g. the country).
+    :param nonzero_only: bool | skips the rows whose value is 0. False by default.
+
+    :returns: generator | (*keys, series_name, date, value) rows.
+    '''
+    dates = df["date"].dt.strftime("%Y-%m-%d").tolist()
+    for column in df.columns:
+        if column == "date":
+            continue
+        if nonzero_only == False:
+            for (date, value) in zip(dates, df[column].tolist()):
+                yield (*keys, column, date, value)
+        else:
+            (rows, values) = nonzero(df[column])
+            for (row, value) in zip(rows.tolist(), values.tolist()):
+                yield (*keys, column, dates[row], value)
+
+def write_long_rows(file, df: pd.DataFrame, *keys, nonzero_only: bool = False):
+    '''
+    Streams the long format rows of a weekly DataFrame to an open csv file.
+
+    :param file: file | file opened in text mode with newline= "".
+    :param df: pandas.DataFrame | 'date' column and one column per variable.
+    :param keys: str | values added at the start of every row (e.g. the country).
+    :param nonzero_only: bool | skips the rows whose value is 0. False by default.
+    '''
+    csv.writer(file, lineterminator= os.linesep).writerows(long_rows(df, *keys, nonzero_only= nonzero_only))
+
+def last_line(path: str, size: int = 65536):
+    '''
+    Reads the last line of a text file without reading the whole file.
+
+    :param path: str | path of the file.
+    :param size: int | bytes read at a time from the end of the file. 64KB by default.
+
+    :returns: tuple | offset in bytes where the last line starts, and the last line.
+    '''
+    with open(path, "rb") as file:
+        end = file.seek(0, os.SEEK_END)
+        content = b""
+        position = end
+        while position > 0:
+            position = max(position - size, 0)
+            file.seek(position)
+            content = file.read(end - position)
+            lines = content.rstrip(b"\r\n")
+            if b"\n" in lines:
+                start = lines.rindex(b"\n") + 1
+                return position + start, lines[start:].decode("utf-8")
+        lines = content.rstrip(b"\r\n")
+        return 0, lines.decode("utf-8")
 
 class SeasonalityScript:
-    def __init__(self, country_code: str, start_date: str, end_date: str, day: str, uk_country: str = None, week_ending: bool = False):
+    def __init__(self, country_code: str, start_date: str, end_date: str, day: str, uk_country: str = None, week_ending: bool = False, client: HolidayProvider = None,
+                 sparse: bool = False, quiet: bool = False, metrics = None, features: list = None, aggregation: dict = None):
         '''
         Creates the object with all the important functions.
 
@@ -17,15 +541,27 @@ class SeasonalityScript:
         :param day: str | the first day of the week (i.e. SUN or MON or TUE...)
         :param uk_country: str | filters between countries in the UK. None by default.
         :param week_ending: bool | converts data from daily to week ending. False by default.
+        :param client: HolidayProvider | source of the holidays (e.g. a NagerClient or a RuleProvider). Uses a cached NagerClient with the default settings by default.
+        :param sparse: bool | stores the variables as sparse columns, which only keep the nonzero values. False by default.
+        :param quiet: bool | doesn't print the progress messages (they are still sent to the 'SeasonalityScript' logger). False by default.
+        :param metrics: function | hook that receives a dict for every stage (duration, rows and columns), request and cache lookup. None by default.
+        :param features: list | additional features, by name (e.g. "quarter") or as dicts with the 'name' and parameters (e.g. {"name": "fourier", "order": 3}).
+                                Available features: holiday_days, holiday_window, payday, month_end, quarter and fourier. None by default.
+        :param aggregation: dict | rules that replace the ones in AGGREGATION: 'holidays' ('sum' counts the holiday days of each week,
+                                   'max' flags the weeks with a holiday) and 'threshold' (days of a week an ISO week, month or quarter needs). None by default.
         '''
+        self.quiet = quiet
+        self.metrics = metrics
+        self.timings = {}
+
         try:
-            print("Creating object...")
+            self.log("Creating object...")
             self.holidays = {}
-            self.week_numbers = []
-            self.week_dummies = {}
-            self.month_numbers = []
-            self.month_dummies = {}
-            self.country_names = {}
+            self.client = client if client is not None else NagerClient(metrics= metrics)
+            self.sparse = sparse
+            self.features = features if features is not None else []
+            feature_specs(self.features)
+            self.aggregation = aggregation_rules(aggregation)
 
             self.country_id = country_code
             self.week_ending = week_ending
@@ -38,42 +574,44 @@ class SeasonalityScript:
             end_year = self.end_date.year
 
             self.years = np.arange(start_year, end_year + 1, 1)
-            
-            # Creates a dictionary with the country code and name
-            url = r'https://date.nager.at/api/v3/AvailableCountries'
-            connection = requests.get(url)
-            response = json.loads(connection.content)
-    
-            for item in response:
-                self.country_names[item["countryCode"]] = item["name"]
-            
+
             result = {"SeasonalityScript successfully created": True}
-            print(result)
+            self.log(result)
         except Exception as error:
-            print(error)
+            self.log(error, logging.ERROR)
             raise
     
+    def log(self, message, level: int = logging.INFO):
+        '''
+        Sends a progress message to the 'SeasonalityScript' logger, and prints it unless the object is quiet or a handler of the logger writes it.
+
+        :param message: str | the message.
+        :param level: int | logging level of the message. logging.INFO by default.
+        '''
+        log(message, self.quiet, level)
+
     def get_version(self):
         version = {"Current version": "1.0.0"}
         print(version)
     
+    @cached_property
+    def country_names(self):
+        '''
+        Country names by country code. They are only retrieved the first time they are needed.
+
+        :returns: dict | the name of every available country.
+        '''
+        return {item["countryCode"]: item["name"] for item in self.client.get_available_countries()}
+
     def get_country_codes(self):
         '''
         :reurns: str | all available countries and their country codes.
         '''
-        self.country_info = {}
+        self.country_info = {name: code for (code, name) in self.country_names.items()}
 
-        url = r'https://date.nager.at/api/v3/AvailableCountries'
-        connection = requests.get(url)
-        response = json.loads(connection.content)
-        
-        for item in response:
-            country_name = item["name"]
-            country_code = item["countryCode"]
-            self.country_info[country_name] = country_code
-        
         return print(self.country_info)
 
+    @stage("df")
     def build_dataframe(self):
         '''
         Builds the structure of the DataFrame.
@@ -81,17 +619,18 @@ class SeasonalityScript:
         :returns: bool | boolean expression indicating whether the process was successfully completed or not.
         '''
         try:
-            print("Building DataFrame...")
+            self.log("Building DataFrame...")
             # Creates a list with all the dates between the start_date and end_date
             # Creates a DataFrame with only one column: 'date'
             self.df = pd.date_range(start= self.start_date, end= self.end_date, freq= f"D").to_frame(index= False, name= 'date')
 
             result = {"DataFrame built succesfully": True}
-            print(result)
+            self.log(result)
         except Exception as error:
-            print(error)
+            self.log(error, logging.ERROR)
             raise
     
+    @stage("df")
     def get_holidays(self):
         '''
         Retrieves data and creates the bank holiday variables.
@@ -99,138 +638,88 @@ class SeasonalityScript:
         :returns: pandas.DataFrame | short view of the DataFrame if the process was successfully completed.
         :returns: bool | boolean expression if the process was not successfully completed.
         '''
-        try:      
-            # Code for countries requests (excl. the UK)
-            if self.uk_country == None:
-                print(f"Getting holidays for {self.country_names[self.country_id]}...")
-
-                # Makes the API requests for all the years between the start_date and end_date
-                # It also creates a (key, value) pair for each bank holiday and its dates
-                for year in self.years:
-                    uri = f"https://date.nager.at/api/v3/PublicHolidays/{year}/{self.country_id}"
-                    connection = requests.get(uri)
-                    response = json.loads(connection.content)
-                    
-                    # Parses the API's response
-                    for item in response:
-                        # Filters by national and public bank holidays
-                        if item["types"][0] == "Public" and item["counties"] == None:
-                            # Extracts the name of the bank holiday and the date
-                            holiday_name = item["name"]
-                            holiday_date = pd.to_datetime(item["date"], format= r"%Y-%m-%d")
-                            
-                            # Creates the (key, value) pair
-                            if holiday_name not in self.holidays:
-                                self.holidays[holiday_name] = []
-                                self.holidays[holiday_name].append(holiday_date)
-                            else:
-                                self.holidays[holiday_name].append(holiday_date)
-
-                # Parses the holiday dictionary (i.e., iterates through all holidays)
-                for holiday in self.holidays:
-                    new_column = []
-
-                    # Creates a list containing 1s and 0s
-                    for (index, row) in self.df.iterrows():
-                        if row["date"] in self.holidays[holiday][:]:
-                            new_column.append(1)
-                        else:
-                            new_column.append(0)
-
-                    # Creates the bank holiday column
-                    holiday = holiday.replace("'", '').replace('.', '').replace(',', '')
-                    self.df['Seasonality-' + holiday] = new_column
-                
-                # Converts the daily data to weekly
-                if self.week_ending == False:
-                    self.df = self.df.resample(f"W-{self.day}", label= "left", closed= "left", on= "date").sum()
-                else:
-                    self.df = self.df.resample(f"W-{self.day}", label= "right", closed= "right", on= "date").sum()
-                
-                # Resets index and changes the dates format
-                self.df.reset_index(inplace= True)
-
-                # Handles punctuation issues
-                if self.country_id == "AR":
-                    self.df = self.df.rename(columns= {'''General José de San Martín Memorial Day''': '''General Jose de San Martin Memorial Day''',
-                                                       '''Anniversary of the Passing of General Martín Miguel de Güemes''': '''Anniversary of the Passing of General Martin Miguel de Güemes'''})
-
-                result = {f"Holidays for {self.country_names[self.country_id]} successfully added to DataFrame": True}
-                print(result)
-            # Code only for the UK requests
+        try:
+            country = self.country_names[self.country_id]
             if self.uk_country != None:
-                country = f"{self.country_names[self.country_id]} - {self.uk_country}"
-                print(f"Getting holidays for {country}...")
-
-                # Makes the API requests for all the years between the start_date and end_date
-                # It also creates a (key, value) pair for each bank holiday and its dates
-                for year in self.years:
-                    uri = f"https://date.nager.at/api/v3/PublicHolidays/{year}/{self.country_id}"
-                    connection = requests.get(uri)
-                    response = json.loads(connection.content)
-                    
-                    # Parses the API's response
-                    # In this case, it will filter by the public holidays that are either unique for the country or shared by all of them
-                    for item in response:
-                        try:
-                            if item["types"][0] == "Public" and country in item["counties"]:
-                                # Extracts the name of the bank holiday and the date
-                                holiday_name = item["name"]
-                                holiday_date = pd.to_datetime(item["date"], format= r"%Y-%m-%d")
-                                
-                                # Creates the (key, value) pair
-                                if holiday_name not in self.holidays:
-                                    self.holidays[holiday_name] = []
-                                    self.holidays[holiday_name].append(holiday_date)
-                                else:
-                                    self.holidays[holiday_name].append(holiday_date)
-                        except:
-                            if item["types"][0] == "Public" or item["counties"] == None:
-                                # Extracts the name of the bank holiday and the date
-                                holiday_name = item["name"]
-                                holiday_date = pd.to_datetime(item["date"], format= r"%Y-%m-%d")
-
-                                # Creates the (key, value) pair     
-                                if holiday_name not in self.holidays:
-                                    self.holidays[holiday_name] = list()
-                                    self.holidays[holiday_name].append(holiday_date)
-                                else:
-                                    self.holidays[holiday_name].append(holiday_date)
-                
-                # Parses the holiday dictionary (i.e., iterates through all holidays)    
-                for holiday in self.holidays:
-                    new_column = list()
-
-                    # Creates a list containing 1s and 0s
-                    for (index, row) in self.df.iterrows():
-                        if row["date"] in self.holidays[holiday][:]:
-                            new_column.append(1)
-                        else:
-                            new_column.append(0)
-
-                    # Creates the bank holiday column
-                    holiday = holiday.replace("'", '').replace('.', '').replace(',', '')
-                    self.df['Seasonality-' + holiday] = new_column
-
-                # Converts daily data to weekly
-                if self.week_ending == False:
-                    self.df = self.df.resample(f"W-{self.day}", label= "left", closed= "left", on= "date").sum()
-                else:
-                    self.df = self.df.resample(f"W-{self.day}", label= "right", closed= "right", on= "date").sum()
+                country = f"{country} - {self.uk_country}"
+            self.log(f"Getting holidays for {country}...")
 
-                # Resets index and changes the dates format
-                self.df.reset_index(inplace= True)
+            self.holidays = self.get_holiday_dates()
+            self.df = self.weekly_holidays(self.df, self.holidays)
 
-                # Solves punctuation issues
-                self.df = self.df.rename(columns= {'''Queen’s Platinum Jubilee BH''': '''Queen's Platinum Jubilee BH''', '''Queen’s State Funeral BH''': '''Queen's State Funeral BH''',
-                                                "Early May Bank Holiday BH": "Early May BH", "Spring Bank Holiday BH": "Spring BH", "Coronation Bank Holiday BH": "Coronation BH"})
-                
-                result = {f"Holidays for {country} successfully added to DataFrame": True}
-                print(result)
+            result = {f"Holidays for {country} successfully added to DataFrame": True}
+            self.log(result)
         except Exception as error:
-            print(error)
+            self.log(error, logging.ERROR)
             raise
 
+    def get_holiday_dates(self, years = None):
+        '''
+        Retrieves the bank holidays for all the years between the start_date and end_date. It doesn't modify the object.
+
+        :param years: list | years to retrieve the holidays from. All the years between the start_date and end_date by default.
+
+        :returns: dict | bank holiday names and the list of dates each one falls on.
+        '''
+        holidays = {}
+        years = self.years if years is None else years
+
+        # Code for countries requests (excl. the UK)
+        if self.uk_country == None:
+            # Makes the API requests for all the years between the start_date and end_date
+            # It also creates a (key, value) pair for each bank holiday and its dates
+            for response in self.client.get_holiday_records(years, self.country_id):
+                # Parses the API's response
+                for item in response:
+                    # Filters by national and public bank holidays
+                    if item["types"][0] == "Public" and item["counties"] == None:
+                        # Extracts the name of the bank holiday and the date
+                        # and creates the (key, value) pair
+                        holiday_date = pd.to_datetime(item["date"], format= r"%Y-%m-%d")
+                        holidays.setdefault(item["name"], []).append(holiday_date)
+        # Code only for the UK requests
+        else:
+            country = f"{self.country_names[self.country_id]} - {self.uk_country}"
+
+            for response in self.client.get_holiday_records(years, self.country_id):
+                # Parses the API's response
+                # In this case, it will filter by the public holidays that are either unique for the country or shared by all of them
+                for item in response:
+                    try:
+                        included = item["types"][0] == "Public" and country in item["counties"]
+                    except:
+                        included = item["types"][0] == "Public" or item["counties"] == None
+
+                    if included:
+                        holiday_date = pd.to_datetime(item["date"], format= r"%Y-%m-%d")
+                        holidays.setdefault(item["name"], []).append(holiday_date)
+
+        return holidays
+
+    def weekly_holidays(self, df: pd.DataFrame, holidays: dict):
+        '''
+        Adds the bank holiday variables to a daily DataFrame and converts it to weekly. It doesn't modify the object.
+
+        :param df: pandas.DataFrame | daily DataFrame with a 'date' column.
+        :param holidays: dict | bank holiday names and the list of dates each one falls on.
+
+        :returns: pandas.DataFrame | weekly DataFrame with the 'date' column and one column per bank holiday.
+        '''
+        how = self.aggregation["holidays"]
+        if self.sparse == True:
+            # Counts the holidays of each week straight into sparse columns
+            return sparse_holiday_counts(df["date"], holidays, self.day, self.week_ending, how)
+
+        # Creates all the bank holiday columns in one vectorized pass and converts them to weekly together
+        indicators = holiday_indicators(df["date"], holidays)
+        (dates, weekly) = aggregate_weeks(df["date"].iloc[0], df["date"].iloc[-1], self.day, self.week_ending,
+                                          indicators.to_numpy(), [how] * indicators.shape[1])
+
+        df = pd.DataFrame(weekly, columns= indicators.columns)
+        df.insert(0, "date", dates)
+        return df
+
+    @stage("weekly_df")
     def build_weekly_dummies(self):
         '''
         Builds a DataFrame containing all weekly dummies.
@@ -239,51 +728,19 @@ class SeasonalityScript:
         :returns: bool | boolean expression if the process was not successfully completed.
         '''
         try:
-            print("Building weekly dummies...")
-            # Creates a new DataFrame with a daily frequency
-            self.weekly_df = pd.date_range(start= self.start_date, end= self.end_date, freq= "D").to_frame(index= False, name= 'date')
-
-            # Creates the 'Week #' column that will be used to create the dummy variables
-            for (index, row) in self.weekly_df.iterrows():
-                self.week_numbers.append(row["date"].isocalendar().week)
-            self.weekly_df["Week #"] = self.week_numbers
-            
-            # Creates the dummy columns and appends them to the DataFrame
-            for i in range(1, 54):
-                week = f"Week {i}"
-                if week not in self.week_dummies:
-                    self.week_dummies[week] = []
-                
-                for (index, row) in self.weekly_df.iterrows():
-                    if row["Week #"] == i:
-                        self.week_dummies[week].append(1)
-                    else:
-                        self.week_dummies[week].append(0)
-                
-                self.weekly_df[f"Seasonality-Week-{week}"] = self.week_dummies[week]
-            
-            # Drop the 'Week #' column
-            self.weekly_df = self.weekly_df.drop(columns= "Week #")
-
-            # Converts daily weeks to weekly
-            if self.week_ending == False:
-                self.weekly_df = self.weekly_df.resample(f"W-{self.day}", label= "left", closed= "left", on= "date").sum()
-            else:
-                self.weekly_df = self.weekly_df.resample(f"W-{self.day}", label= "right", closed= "right", on= "date").sum()
-            
-            # Replaces values to 1s and 0s
-            for column in self.weekly_df.columns:
-                self.weekly_df[column] = (self.weekly_df[column] > 3).astype(int)
-            
-            # Resets index and changes the date format 
-            self.weekly_df.reset_index(inplace= True)
+            self.log("Building weekly dummies...")
+            # Reuses the dummies already built for the same dates and week settings
+            self.weekly_df = weekly_dummies(self.start_date, self.end_date, self.day, self.week_ending, self.aggregation["threshold"]).copy()
+            if self.sparse == True:
+                self.weekly_df = to_sparse(self.weekly_df)
 
             result = {"Weekly dummies built successfully": True}
-            print(result)
+            self.log(result)
         except Exception as error:
-            print(error)
+            self.log(error, logging.ERROR)
             raise
 
+    @stage("monthly_df")
     def build_monthly_dummies(self):
         '''
         Builds a DataFrame containing all monthly dummies.
@@ -292,56 +749,66 @@ class SeasonalityScript:
         :returns: bool | boolean expression if the process was not successfully completed.
         '''
         try:
-            print("Building monthly dummies...")
-
-            # Creates a new DataFrame with a daily frequency
-            self.monthly_df = pd.date_range(start= self.start_date, end= self.end_date, freq= "D").to_frame(index= False, name= 'date')
-
-            # Creates the 'Month #' column that's use to create the dummy variables
-            for (index, row) in self.monthly_df.iterrows():
-                self.month_numbers.append(row.date.month)
-            self.monthly_df["Month #"] = self.month_numbers
-            
-            # Creates the dummy variables and appends them to the DataFrame
-            months = ["January", "February", "March", "April", "May", "June", 
-                      "July", "August", "September", "October", "November", "December"]
-
-            for i in range(1, 13):
-                month = months[i - 1]
-
-                if month not in self.month_dummies: 
-                    self.month_dummies[month] = []
-
-                for (index, row) in self.monthly_df.iterrows():
-                    if row["Month #"] == i:
-                        self.month_dummies[month].append(1)
-                    else:
-                        self.month_dummies[month].append(0)
-
-                self.monthly_df[f"Seasonality-{month}"] = self.month_dummies[month]
-            
-            # Drops unused columns
-            self.monthly_df = self.monthly_df.drop(columns= ["Month #"])
-            
-            # Converts daily data to weekly
-            if self.week_ending == False:
-                self.monthly_df = self.monthly_df.resample(f"W-{self.day}", label= "left", closed= "left", on= "date").sum()
-            else:
-                self.monthly_df = self.monthly_df.resample(f"W-{self.day}", label= "right", closed= "right", on= "date").sum()
-            
-            # Replaces values to 0s and 1s
-            for column in self.monthly_df.columns:
-                self.monthly_df[column] = (self.monthly_df[column] > 3).astype(int)
+            self.log("Building monthly dummies...")
 
-            # Resets index and changes the dates formats
-            self.monthly_df.reset_index(inplace= True)
+            # Reuses the dummies already built for the same dates and week settings
+            self.monthly_df = monthly_dummies(self.start_date, self.end_date, self.day, self.week_ending, self.aggregation["threshold"]).copy()
+            if self.sparse == True:
+                self.monthly_df = to_sparse(self.monthly_df)
 
             result = {"Monthly dummies built successfully": True}
-            print(result)
+            self.log(result)
         except Exception as error:
-            print(error)
+            self.log(error, logging.ERROR)
             raise
         
+    @stage("features_df")
+    def build_features(self):
+        '''
+        Builds a DataFrame containing the additional features, using the bank holidays retrieved by get_holidays.
+        '''
+        try:
+            self.log("Building features...")
+            holidays = self.feature_holidays(self.start_date, self.end_date, self.holidays)
+            self.features_df = weekly_features(self.start_date, self.end_date, self.day, self.week_ending, holidays, self.features,
+                                               self.aggregation["threshold"])
+            if self.sparse == True:
+                self.features_df = to_sparse(self.features_df)
+
+            result = {"Features built successfully": True}
+            self.log(result)
+        except Exception as error:
+            self.log(error, logging.ERROR)
+            raise
+
+    def feature_holidays(self, start_date, end_date, holidays: dict):
+        '''
+        Adds the bank holidays of the years next to the dates that the holiday windows reach (e.g. the
+        New Year's Day after the end_date, which flags the days before it). It doesn't modify the object.
+
+        :param start_date: pandas.Timestamp | first date.
+        :param end_date: pandas.Timestamp | last date.
+        :param holidays: dict | bank holidays of the years between both dates.
+
+        :returns: dict | bank holiday names and the list of dates each one falls on.
+        '''
+        windows = [params for (name, params) in feature_specs(self.features) if name == "holiday_window"]
+        if len(windows) == 0:
+            return holidays
+
+        before = max(params.get("before", 1) for params in windows)
+        after = max(params.get("after", 1) for params in windows)
+        years = {(start_date - pd.Timedelta(days= after)).year, (end_date + pd.Timedelta(days= before)).year}
+        years = sorted(year for year in years if not start_date.year <= year <= end_date.year)
+        if len(years) == 0:
+            return holidays
+
+        holidays = {name: list(dates) for (name, dates) in holidays.items()}
+        for (name, dates) in self.get_holiday_dates(years).items():
+            holidays.setdefault(name, []).extend(dates)
+        return holidays
+
+    @stage("df")
     def join_dataframes(self):
         '''
         Joins all DataFrames created into one.
@@ -349,96 +816,267 @@ class SeasonalityScript:
         :returns: bool | boolean expression indicating if the process was completed or not.
         '''
         try:
-            print("Joining all dataframes...")
+            self.log("Joining all dataframes...")
 
-            # Joins the weekly and monthly dummies DataFrames
-            # It uses the 'inner join' method and the 'date' column
-            self.new_df = self.weekly_df.merge(self.monthly_df, how= "inner", on= "date")
+            # Every DataFrame was converted with the same weeks, so they're put side by side instead of merged on 'date'
+            self.new_df = hstack_weeks([self.weekly_df, self.monthly_df])
 
-            # Joins the bank holidays DataFrame with the new one
-            # It uses the 'inner join' method and the 'date' column
-            self.df = self.df.merge(self.new_df, how= "inner", on= "date")
+            # Bank holidays go first and the additional features at the end
+            frames = [self.df, self.weekly_df, self.monthly_df]
+            if len(self.features) > 0:
+                frames.append(self.features_df)
+            self.df = hstack_weeks(frames)
 
             result = {"DataFrames successfully joined": True}
-            print(result)
+            self.log(result)
         except Exception as error:
-            print(error)
+            self.log(error, logging.ERROR)
             raise
 
-    def get_csv(self, outpath: str, long_format: bool = False):
+    def build(self, output: str = "wide", dtype = None):
+        '''
+        Builds all the seasonality variables in memory. It doesn't write any file, print anything or modify
+        the object, so several threads can call it at the same time on the same object. For the same reason,
+        it isn't recorded in timings or sent to the metrics hook as a stage.
+
+        :param output: str | 'wide' (one column per variable), 'long' (one row per variable and week) or 'matrix'. 'wide' by default.
+        :param dtype: numpy.dtype | type of the 'matrix' values. By default, int64 (uint8 when the object is sparse), or float64 when
+                      a feature is an average (e.g. fourier).
+
+        :returns: pandas.DataFrame | 'date' column and one column per variable (wide), or 'series_name', 'date' and 'value' columns (long).
+        :returns: tuple | for 'matrix', the matrix (one row per week), the variable names of its columns and the dates of its rows.
+        '''
+        if output not in ["wide", "long", "matrix"]:
+            raise ValueError(f"output should be 'wide', 'long' or 'matrix', not {output!r}")
+
+        df = self.build_weeks(self.start_date, self.end_date)
+
+        if output == "long":
+            df = df.melt(id_vars= "date", var_name= "series_name", value_name= "value")
+            return df[["series_name", "date", "value"]]
+        if output == "matrix":
+            columns = [column for column in df.columns if column != "date"]
+            return df[columns].to_numpy(dtype= dtype), columns, df["date"].to_numpy()
+        return df
+
+    def build_weeks(self, start_date, end_date):
+        '''
+        Builds all the seasonality variables for the weeks between two dates. It doesn't modify the object.
+
+        Only the years between both dates are retrieved. The first and last weeks only count the days
+        between both dates, like the first and last weeks of the whole dataset.
+
+        :param start_date: pandas.Timestamp | first date.
+        :param end_date: pandas.Timestamp | last date.
+
+        :returns: pandas.DataFrame | 'date' column and one column per variable.
+        '''
+        df = pd.date_range(start= start_date, end= end_date, freq= "D").to_frame(index= False, name= 'date')
+        holidays = self.get_holiday_dates(np.arange(start_date.year, end_date.year + 1, 1))
+        threshold = self.aggregation["threshold"]
+
+        # Puts the variables side by side the same way join_dataframes does
+        frames = [weekly_dummies(start_date, end_date, self.day, self.week_ending, threshold),
+                  monthly_dummies(start_date, end_date, self.day, self.week_ending, threshold)]
+        if len(self.features) > 0:
+            frames.append(weekly_features(start_date, end_date, self.day, self.week_ending,
+                                          self.feature_holidays(start_date, end_date, holidays), self.features, threshold))
+        if self.sparse == True:
+            frames = [to_sparse(frame) for frame in frames]
+        return hstack_weeks([self.weekly_holidays(df, holidays)] + frames)
+
+    @stage("df")
+    def extend_csv(self, outpath: str, long_format: bool = False, filename: str = r'Seasonality.csv', nonzero_only: bool = False):
+        '''
+        Extends an existing Seasonality csv file up to the end_date, instead of creating it again.
+
+        The object should be created with the same start_date and settings used for the file, and the new end_date.
+        Only the weeks after the last one in the file are built (plus the last one, which is built again
+        because it may have been incomplete), and only their years are retrieved. Wide files are appended to in place,
+        unless the new weeks bring new bank holidays. Long format files are rewritten, as rows are sorted by variable.
+
+        :param outpath: str | folder in which the file is.
+        :param long_format: bool | whether the file is in long format. False by default.
+        :param filename: str | name of the csv file. 'Seasonality.csv' by default.
+        :param nonzero_only: bool | whether the long format file skips the rows whose value is 0. False by default.
+        '''
+        try:
+            self.log("Extending CSV file...")
+            path = os.path.join(outpath, filename)
+
+            ## Reads the variables and the last week of the file
+            if long_format == False:
+                with open(path, encoding= "utf-8", newline= "") as file:
+                    reader = csv.reader(file)
+                    for _ in range(10):
+                        columns = next(reader)
+                variables = columns[2:]
+                (offset, last_row) = last_line(path)
+                last_date = pd.Timestamp(last_row.split(",")[1])
+            else:
+                existing = pd.read_csv(path, header= None, names= ["series_name", "date", "value"], parse_dates= ["date"],
+                                       float_precision= "round_trip")
+                variables = list(pd.unique(existing["series_name"]))
+                ## Files without the rows whose value is 0 may not have their last weeks, when every variable is 0 in them.
+                ## Those weeks are built again too, from the last week that is in the file
+                last_date = existing["date"].max()
+
+            ## Builds the weeks from the start of the last one in the file
+            ## The last week is built again because it may have been incomplete
+            last_week = last_date if self.week_ending == False else last_date - pd.Timedelta(days= 6)
+            if self.end_date < last_week:
+                raise ValueError(f"end_date ({self.end_date.date()}) is before the last week in {path}, dated {last_date.date()}")
+            start_date = max(last_week, self.start_date)
+            new_df = self.build_weeks(start_date, self.end_date)
+
+            ## New bank holidays go after the existing ones, where a full run would put them. The weekly, monthly and
+            ## additional variables are taken from the new weeks, as files without the 0 rows may not have all of them
+            position = new_df.columns.get_loc("Seasonality-Week-Week 1")
+            calendar = list(new_df.columns[position:])
+            holidays = [column for column in variables if column not in calendar]
+            new_holidays = [column for column in new_df.columns[1:position] if column not in holidays]
+            variables = holidays + new_holidays + calendar
+            new_df = new_df.reindex(columns= ["date"] + variables, fill_value= 0)
+
+            if long_format == False and len(new_holidays) == 0:
+                ## Replaces the last week and appends the new ones at the end of the file
+                with open(path, "r+", encoding= "utf-8", newline= "") as file:
+                    file.seek(offset)
+                    file.truncate()
+                    new_df.assign(account= "national").to_csv(file, columns= columns, index= False, header= False)
+            else:
+                if long_format == False:
+                    existing = pd.read_csv(path, skiprows= 9, parse_dates= ["date"], float_precision= "round_trip").drop(columns= "account")
+                else:
+                    ## The weeks and variables missing from files without the 0 rows are 0
+                    weeks = week_bins(self.start_date, self.end_date, self.day, self.week_ending)[0]
+                    existing = existing.pivot(index= "date", columns= "series_name", values= "value").reindex(weeks).fillna(0).reset_index()
+                existing = existing[existing["date"] < new_df["date"].iloc[0]].reindex(columns= ["date"] + variables, fill_value= 0)
+
+                ## A float feature (e.g. the Fourier terms) makes the whole 'value' column of long files float,
+                ## so the variables that are integers in the new weeks are converted back
+                existing = existing.astype({column: "int64" for column in variables if pd.api.types.is_integer_dtype(new_df[column])})
+                self.df = pd.concat([existing, new_df], ignore_index= True)
+                self.write_csv(outpath, long_format, filename, nonzero_only= nonzero_only)
+
+            result = {f"CSV file successfully extended to {self.end_date.date()}": True}
+            self.log(result)
+        except Exception as error:
+            self.log(error, logging.ERROR)
+            raise
+
+    @stage("df")
+    def get_csv(self, outpath: str, long_format: bool = False, nonzero_only: bool = False, filename: str = r'Seasonality.csv'):
         '''
         Creates the Seasonality csv file.
 
         :param outpath: str | folder in which data should be written to.
-        
+        :param long_format: bool | writes one row per variable and week instead of one column per variable. False by default.
+        :param nonzero_only: bool | skips the long format rows whose value is 0. False by default.
+        :param filename: str | name of the csv file. 'Seasonality.csv' by default.
+
+        :returns: bool | boolean expression indicating whether the process was successfully completed or not.
+        '''
+        self.build_dataframe()
+        self.get_holidays()
+        self.build_weekly_dummies()
+        self.build_monthly_dummies()
+        if len(self.features) > 0:
+            self.build_features()
+        self.join_dataframes()
+        self.write_csv(outpath, long_format, filename, nonzero_only= nonzero_only)
+
+    @stage("df")
+    def write_csv(self, outpath: str, long_format: bool = False, filename: str = r'Seasonality.csv', nonzero_only: bool = False):
+        '''
+        Writes the joined DataFrame to a csv file with the rows needed by the modeling tool.
+
+        :param outpath: str | folder in which data should be written to.
+        :param long_format: bool | writes one row per variable and week instead of one column per variable. False by default.
+        :param filename: str | name of the csv file. 'Seasonality.csv' by default.
+        :param nonzero_only: bool | skips the long format rows whose value is 0. False by default.
+
         :returns: bool | boolean expression indicating whether the process was successfully completed or not.
         '''
         try:
-            self.build_dataframe()
-            self.get_holidays()
-            self.build_weekly_dummies()
-            self.build_monthly_dummies()
-            self.join_dataframes()
-
-            print("Preparing CSV file...")
-
-            ## Creates the 'account' column and change the order of columns
-            self.df["account"] = "national"
-            columns = list(self.df.columns)
-            columns = columns[-1:] + columns[:-1]
-            self.df = self.df[columns]
-
-            ## Creates an array with the DataFrame's headers
-            ## That row will be added at the top of the DataFrame before adding the blank rows
-            headers_row = []
-            for header in self.df.columns:
-                headers_row.append(header)
-            headers_row = np.array([headers_row])
-
-            ## Saves the DataFrame into a CSV file and
-            ## opens it without the headers
-            self.df.to_csv(outpath + r"Seasonality.csv", index= False)
-            self.df = pd.read_csv(outpath + r"Seasonality.csv", skiprows= [0], header= None)
-            headers_row = pd.DataFrame(headers_row, columns= self.df.columns, index= [0])
-
-            ## Creates a DataFrame with the blank rows needed for the modeling tool
-            rows = list()
-            for r in range(0, 10):
-                row = list()
-                if r == 9:
-                    for c in range(0, len(self.df.columns)):
-                        if c == 0 or c == 1: row.append(None)
-                        else: row.append("SUB")
-                else:        
-                    for c in range(0, len(self.df.columns)):
-                        row.append("Blank")
-                rows.append(row)
-            blank = pd.DataFrame(data= rows, columns= self.df.columns)
-
-            ## Adds the headers row at the top of the new DataFrame
-            self.df = pd.concat([headers_row, self.df], ignore_index= True)
-
-            ## Concatenate both DataFrames and saves the new CSV file
-            self.df = pd.concat([blank, self.df], ignore_index= True)
-            self.df = self.df.iloc[1:, :]
-
-            path_corrected = os.path.join(outpath, r'Seasonality.csv')
-            if long_format == False:
-                self.df.to_csv(path_corrected, index= False, header= None)
-            else:
-                self.df.columns = list(self.df.iloc[8, :])
-                self.df = self.df.iloc[9:, 1:]
-                self.df = self.df.melt(id_vars= 'date', var_name= 'series_name', value_name= 'value')
-                self.df = self.df[['series_name', 'date', 'value']]
-                self.df.to_csv(path_corrected, index= False, header= None)
+            self.log("Preparing CSV file...")
+
+            ## Writes the file in a single pass, without reading it back
+            columns = ["account"] + list(self.df.columns)
+            with open(os.path.join(outpath, filename), "w", encoding= "utf-8", newline= "") as file:
+                if long_format == False:
+                    writer = csv.writer(file, lineterminator= os.linesep)
 
-            # if long_format == True:
-            #     self.df = self.df.melt(id_vars= "date", var_name= "series_name", value_name= "value")
-            #     self.df.series_name = self.df.series_name.apply(lambda x: "Seasonality_" + x)
+                    ## Writes the blank rows needed for the modeling tool and the headers row
+                    writer.writerows(preamble_rows(columns))
+                    writer.writerow(columns)
+
+                    ## Creates the 'account' column and writes the data rows after the headers
+                    self.df.assign(account= "national").to_csv(file, columns= columns, index= False, header= False)
+                else:
+                    write_long_rows(file, self.df, nonzero_only= nonzero_only)
 
-            # self.df.to_csv(outpath + r"Seasonality.csv", index= False)
             result = {"CSV file successfully written": True}
-            print(result)
+            self.log(result)
+        except Exception as error:
+            self.log(error, logging.ERROR)
+            raise
+
+    @stage("df")
+    def get_table(self, outpath: str, file_format: str = "parquet", long_format: bool = False, nonzero_only: bool = False,
+                  filename: str = None):
+        '''
+        Creates the Seasonality file in a columnar format (Parquet, Feather or Arrow IPC).
+
+        :param outpath: str | folder in which data should be written to.
+        :param file_format: str | 'parquet', 'feather' or 'arrow'. 'parquet' by default.
+        :param long_format: bool | writes one row per variable and week instead of one column per variable. False by default.
+        :param nonzero_only: bool | skips the long format rows whose value is 0. False by default.
+        :param filename: str | name of the file. 'Seasonality' plus the extension of the format by default.
+        '''
+        self.build_dataframe()
+        self.get_holidays()
+        self.build_weekly_dummies()
+        self.build_monthly_dummies()
+        if len(self.features) > 0:
+            self.build_features()
+        self.join_dataframes()
+        self.write_table(outpath, file_format, long_format, filename, nonzero_only= nonzero_only)
+
+    @stage("df")
+    def write_table(self, outpath: str, file_format: str = "parquet", long_format: bool = False, filename: str = None,
+                    nonzero_only: bool = False):
+        '''
+        Writes the joined DataFrame in a columnar format. Variables are stored as uint8 (float32 for averages) and the rows
+        needed by the modeling tool are kept as file metadata.
+
+        :param outpath: str | folder in which data should be written to.
+        :param file_format: str | 'parquet', 'feather' or 'arrow'. 'parquet' by default.
+        :param long_format: bool | writes one row per variable and week instead of one column per variable. False by default.
+        :param filename: str | name of the file. 'Seasonality' plus the extension of the format by default.
+        :param nonzero_only: bool | skips the long format rows whose value is 0. False by default.
+        '''
+        try:
+            self.log(f"Preparing {file_format} file...")
+            if file_format not in FILE_FORMATS:
+                raise ValueError(f"file_format should be one of {list(FILE_FORMATS)}, not {file_format!r}")
+
+            table = feature_table(self.df, long_format, nonzero_only)
+            path = os.path.join(outpath, filename if filename is not None else "Seasonality" + FILE_FORMATS[file_format])
+
+            if file_format == "parquet":
+                import pyarrow.parquet as pq
+                pq.write_table(table, path)
+            elif file_format == "feather":
+                import pyarrow.feather as feather
+                feather.write_feather(table, path)
+            else:
+                import pyarrow as pa
+                with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+            result = {f"{file_format} file successfully written": True}
+            self.log(result)
         except Exception as error:
-            print(error)
+            self.log(error, logging.ERROR)
             raise
\ No newline at end of file
@@ -1 +1,37 @@
-from .SeasonalityScript import *
\ No newline at end of file
+import importlib
+import sys
+import types
+
+# pandas and requests take most of the import time, so the modules are only imported
+# the first time one of their names is used (e.g. from SeasonalityScript import SeasonalityScript)
+modules = {"NagerClient": ".nager", "get_batch_csv": ".batch", "HolidayProvider": ".providers", "RuleProvider": ".providers"}
+
+__all__ = ["SeasonalityScript", "NagerClient", "HolidayProvider", "RuleProvider", "get_batch_csv", "DAYS", "MONTHS", "FILE_FORMATS", "CALENDAR_CACHE_SIZE",
+           "weekday", "week_bins", "majority_dummies", "weekly_dummies", "monthly_dummies", "holiday_columns", "holiday_indicators",
+           "nonzero", "to_sparse", "sparse_holiday_counts", "preamble_rows", "feature_table", "long_rows",
+           "write_long_rows", "last_line"]
+
+def __getattr__(name: str):
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(modules.get(name, ".SeasonalityScript"), __name__)
+    if not hasattr(module, name):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Same names as 'from .SeasonalityScript import *'. It also replaces the SeasonalityScript
+    # submodule, which the import sets as an attribute of the package, with the class
+    if module.__name__ == f"{__name__}.SeasonalityScript":
+        globals().update({key: value for (key, value) in vars(module).items() if not key.startswith("_")})
+    globals()[name] = getattr(module, name)
+    return globals()[name]
+
+class Package(types.ModuleType):
+    def __setattr__(self, name: str, value):
+        # Importing the SeasonalityScript submodule (e.g. from SeasonalityScript.SeasonalityScript import weekly_dummies)
+        # sets it as an attribute of the package once it's loaded. The class is kept instead, like 'import *' did
+        if name == "SeasonalityScript" and isinstance(value, types.ModuleType):
+            value = value.SeasonalityScript
+        super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = Package
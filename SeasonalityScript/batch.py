@@ -0,0 +1,104 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from . import SeasonalityScript, write_long_rows
+from .instrumentation import log
+from .nager import NagerClient
+from .providers import HolidayProvider
+
+def build_holidays(country_code: str, uk_country: str, start_date: str, end_date: str, day: str, week_ending: bool, client: HolidayProvider,
+                   sparse: bool = False, quiet: bool = False, features: list = None, aggregation: dict = None):
+    '''
+    Builds the weekly bank holiday DataFrame of one target, and its additional features. Runs in the worker processes.
+
+    :returns: tuple | weekly bank holiday variables and additional features (None without features) of the target.
+    '''
+    data = SeasonalityScript(country_code, start_date, end_date, day, uk_country, week_ending, client, sparse, quiet, features= features,
+                             aggregation= aggregation)
+    data.build_dataframe()
+    data.get_holidays()
+    if len(data.features) > 0:
+        data.build_features()
+        return data.df, data.features_df
+    return data.df, None
+
+def get_batch_csv(targets: list, start_date: str, end_date: str, day: str, outpath: str, week_ending: bool = False,
+                  long_format: bool = False, single_file: bool = False, workers: int = None, client: HolidayProvider = None,
+                  sparse: bool = False, nonzero_only: bool = False, quiet: bool = False, metrics = None, features: list = None,
+                  aggregation: dict = None):
+    '''
+    Creates the Seasonality csv files of several countries that share the same dates and week settings.
+
+    The country list is retrieved once and the weekly and monthly dummies are built once for all targets,
+    while the bank holidays of each target are built in parallel across a process pool.
+
+    :param targets: list | (country_code, uk_country) pairs (e.g. [("US", None), ("GB", "ENG")]). A country code alone is also accepted.
+    :param start_date: str | first date in your dataset. it should have the following format: %dd%mm%yyyy.
+    :param end_date: str | last date in your dataset. it should have the following format: %dd%mm%yyyy.
+    :param day: str | the first day of the week (i.e. SUN or MON or TUE...)
+    :param outpath: str | folder in which data should be written to.
+    :param week_ending: bool | converts data from daily to week ending. False by default.
+    :param long_format: bool | writes one row per variable and week instead of one column per variable. False by default.
+    :param single_file: bool | writes all targets to one long format 'Seasonality.csv' file with a country column. False by default.
+    :param workers: int | number of processes. Uses one per CPU by default.
+    :param client: HolidayProvider | source of the holidays (e.g. a NagerClient or a RuleProvider). Uses a cached NagerClient with the default settings by default.
+    :param sparse: bool | stores the variables as sparse columns, which only keep the nonzero values. False by default.
+    :param nonzero_only: bool | skips the long format rows whose value is 0. False by default.
+    :param quiet: bool | doesn't print the progress messages (they are still sent to the 'SeasonalityScript' logger). False by default.
+    :param metrics: function | hook that receives the events of the objects built in this process. None by default.
+    :param features: list | additional features of every target, like the 'features' parameter of SeasonalityScript. None by default.
+    :param aggregation: dict | daily to weekly rules of every target, like the 'aggregation' parameter of SeasonalityScript. None by default.
+
+    :returns: list | paths of the files written.
+    '''
+    try:
+        targets = [(target, None) if isinstance(target, str) else tuple(target) for target in targets]
+        client = client if client is not None else NagerClient(metrics= metrics)
+
+        # Retrieves the country list once. The client keeps it and ships it to the workers
+        client.get_available_countries()
+
+        # The weekly and monthly dummies only depend on the dates and week settings
+        calendar = SeasonalityScript(targets[0][0], start_date, end_date, day, week_ending= week_ending, client= client, sparse= sparse,
+                                     quiet= quiet, metrics= metrics, aggregation= aggregation)
+        calendar.build_weekly_dummies()
+        calendar.build_monthly_dummies()
+
+        log(f"Getting holidays for {len(targets)} targets...", quiet)
+        with ProcessPoolExecutor(max_workers= workers) as executor:
+            futures = [executor.submit(build_holidays, country_code, uk_country, start_date, end_date, day, week_ending, client, sparse, quiet,
+                                       features, aggregation)
+                       for (country_code, uk_country) in targets]
+            holidays = [future.result() for future in futures]
+
+        paths = []
+        joined = []
+        for ((country_code, uk_country), (df, features_df)) in zip(targets, holidays):
+            name = country_code if uk_country is None else f"{country_code}-{uk_country}"
+
+            data = SeasonalityScript(country_code, start_date, end_date, day, uk_country, week_ending, client, sparse, quiet, metrics, features, aggregation)
+            data.df = df
+            data.weekly_df = calendar.weekly_df
+            data.monthly_df = calendar.monthly_df
+            data.features_df = features_df
+            data.join_dataframes()
+
+            if single_file == False:
+                data.write_csv(outpath, long_format, filename= f"Seasonality_{name}.csv", nonzero_only= nonzero_only)
+                paths.append(os.path.join(outpath, f"Seasonality_{name}.csv"))
+            else:
+                joined.append((name, data.df))
+
+        # Streams the long format rows of every target to the same file
+        if single_file == True:
+            paths.append(os.path.join(outpath, r'Seasonality.csv'))
+            with open(paths[-1], "w", encoding= "utf-8", newline= "") as file:
+                for (name, df) in joined:
+                    write_long_rows(file, df, name, nonzero_only= nonzero_only)
+
+        result = {f"CSV files for {len(targets)} targets successfully written": True}
+        log(result, quiet)
+        return paths
+    except Exception as error:
+        log(error, quiet, logging.ERROR)
+        raise
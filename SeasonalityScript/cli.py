@@ -0,0 +1,205 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .instrumentation import configured, log, logger
+
+# pandas and requests are only imported once the arguments are valid, so '--help' and usage errors are instant
+FORMATS = ["csv", "parquet", "feather", "arrow"]
+JOB_KEYS = ["country", "start_date", "end_date", "day", "uk_country", "week_ending", "format", "long_format",
+            "nonzero_only", "sparse", "outpath", "filename", "features", "aggregation"]
+REQUIRED_KEYS = ["country", "start_date", "end_date", "day"]
+
+def load_manifest(path: str):
+    '''
+    Reads a YAML or JSON manifest. It's either a list of jobs or a mapping with a 'jobs' list and
+    'defaults' shared by all of them. Each job has the same keys as the single target arguments.
+
+    :param path: str | manifest file. Files ending in '.json' are read as JSON and the rest as YAML.
+
+    :returns: list | one dict per job, with the defaults applied.
+    '''
+    with open(path, "r", encoding= "utf-8") as file:
+        if path.lower().endswith(".json"):
+            manifest = json.load(file)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML manifests require pyyaml: pip install SeasonalityScript[yaml]") from None
+            try:
+                manifest = yaml.safe_load(file)
+            except yaml.YAMLError as error:
+                raise ValueError(f"{path} isn't valid YAML: {error}") from None
+
+    if isinstance(manifest, list):
+        manifest = {"jobs": manifest}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("jobs"), list) or len(manifest["jobs"]) == 0:
+        raise ValueError(f"{path} should contain a non-empty list of jobs")
+
+    defaults = manifest.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise ValueError(f"The defaults in {path} should be a mapping, not {type(defaults).__name__}")
+
+    jobs = []
+    for (number, job) in enumerate(manifest["jobs"], start= 1):
+        if not isinstance(job, dict):
+            raise ValueError(f"Job {number} in {path} should be a mapping, not {type(job).__name__}")
+        job = {**defaults, **job}
+        unknown = [key for key in job if key not in JOB_KEYS]
+        missing = [key for key in REQUIRED_KEYS if job.get(key) is None]
+        if len(unknown) > 0 or len(missing) > 0:
+            raise ValueError(f"Job {number} in {path}: unknown keys {unknown}, missing keys {missing}")
+        if job.get("format", "csv") not in FORMATS:
+            raise ValueError(f"Job {number} in {path}: format should be one of {FORMATS}")
+        jobs.append(job)
+    return jobs
+
+def job_name(job: dict):
+    '''
+    :returns: str | the country code of the job, followed by the UK country if there is one (e.g. 'GB-ENG').
+    '''
+    return job["country"] if job.get("uk_country") is None else f"{job['country']}-{job['uk_country']}"
+
+def failed(name: str, error: Exception):
+    '''
+    Reports a failed job to the 'SeasonalityScript' logger, and writes it to stderr when no handler of the logger does, even when quiet.
+    '''
+    if configured(logging.ERROR) == False:
+        print(f"{name} failed: {error!r}", file= sys.stderr)
+    logger.error("%s failed: %r", name, error)
+
+def run_job(job: dict, client, quiet: bool = False, stem: str = "Seasonality"):
+    '''
+    Creates the Seasonality file of one job. Runs in the worker processes.
+
+    :param job: dict | the job, with the same keys as the single target arguments.
+    :param client: HolidayProvider | source of the holidays.
+    :param quiet: bool | doesn't print the progress messages. False by default.
+    :param stem: str | name of the file, without the extension, when the job doesn't set a filename. 'Seasonality' by default.
+
+    :returns: str | path of the file written.
+    '''
+    from . import FILE_FORMATS, SeasonalityScript
+
+    file_format = job.get("format", "csv")
+    outpath = job.get("outpath", ".")
+    filename = job.get("filename") or f"{stem}{FILE_FORMATS.get(file_format, '.csv')}"
+    os.makedirs(outpath, exist_ok= True)
+
+    data = SeasonalityScript(job["country"], job["start_date"], job["end_date"], job["day"], job.get("uk_country"),
+                             job.get("week_ending", False), client, job.get("sparse", False), quiet, features= job.get("features"),
+                             aggregation= job.get("aggregation"))
+    if file_format == "csv":
+        data.get_csv(outpath, job.get("long_format", False), job.get("nonzero_only", False), filename)
+    else:
+        data.get_table(outpath, file_format, job.get("long_format", False), job.get("nonzero_only", False), filename)
+    return os.path.join(outpath, filename)
+
+def run_jobs(jobs: list, client, workers: int = None, quiet: bool = False):
+    '''
+    Runs the jobs across a process pool. Every worker shares the client's cache folder, and the
+    country list is retrieved once and shipped to the workers with the client. Jobs without a
+    filename write 'Seasonality_<country>' files (e.g. Seasonality_GB-ENG.csv).
+
+    :param jobs: list | the jobs, as returned by load_manifest().
+    :param client: HolidayProvider | source of the holidays.
+    :param workers: int | number of processes. Uses one per CPU by default.
+    :param quiet: bool | doesn't print the progress messages. False by default.
+
+    :returns: int | number of jobs that failed.
+    '''
+    client.get_available_countries()
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers= workers) as executor:
+        futures = {executor.submit(run_job, job, client, quiet, f"Seasonality_{job_name(job)}"): job for job in jobs}
+        for future in as_completed(futures):
+            name = job_name(futures[future])
+            try:
+                log(f"{name}: {future.result()}", quiet)
+            except Exception as error:
+                failures += 1
+                failed(name, error)
+    return failures
+
+def parser():
+    '''
+    :returns: argparse.ArgumentParser | the parser of the 'seasonality' command.
+    '''
+    parser = argparse.ArgumentParser(prog= "seasonality", description= "Creates the bank holidays and seasonality variables.")
+    parser.add_argument("country", nargs= "?", help= "two letter code for the country (e.g. US)")
+    parser.add_argument("start_date", nargs= "?", help= "first date in the dataset, as dd/mm/yyyy")
+    parser.add_argument("end_date", nargs= "?", help= "last date in the dataset, as dd/mm/yyyy")
+    parser.add_argument("day", nargs= "?", help= "first day of the week (MON, TUE, ..., SUN)")
+    parser.add_argument("--uk-country", dest= "uk_country", help= "country in the UK (ENG, SCT, WLS or NIR)")
+    parser.add_argument("--week-ending", dest= "week_ending", action= "store_true", help= "converts data from daily to week ending")
+    parser.add_argument("--format", choices= FORMATS, default= "csv", help= "file format. csv by default")
+    parser.add_argument("--long-format", dest= "long_format", action= "store_true", help= "one row per variable and week")
+    parser.add_argument("--nonzero-only", dest= "nonzero_only", action= "store_true", help= "skips the long format rows whose value is 0")
+    parser.add_argument("--sparse", action= "store_true", help= "stores the variables as sparse columns")
+    parser.add_argument("--features", type= lambda value: value.split(","),
+                        help= "comma separated additional features with their default settings (e.g. quarter,holiday_days,fourier)")
+    parser.add_argument("--outpath", default= ".", help= "folder the files are written to. The current folder by default")
+    parser.add_argument("--filename", help= "name of the file. 'Seasonality' plus the extension of the format by default")
+    parser.add_argument("--manifest", help= "YAML or JSON file with the jobs to run, instead of a single target")
+    parser.add_argument("--workers", type= int, help= "number of processes for the manifest jobs. One per CPU by default")
+    parser.add_argument("--cache-dir", dest= "cache_dir", help= "folder the API responses are cached in, shared by all the jobs")
+    parser.add_argument("--offline", action= "store_true", help= "only uses cached API responses")
+    parser.add_argument("--provider", choices= ["nager", "rules"], default= "nager",
+                        help= "source of the holidays: the Nager.Date API or the local calendar rules. nager by default")
+    parser.add_argument("--quiet", action= "store_true", help= "doesn't print the progress messages")
+    parser.add_argument("--log-level", dest= "log_level", choices= ["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help= "sends the 'SeasonalityScript' logger to stderr with this level")
+    return parser
+
+def main(argv: list = None):
+    '''
+    Entry point of the 'seasonality' command.
+
+    :param argv: list | command line arguments. sys.argv by default.
+
+    :returns: int | 0 if every job succeeded, 1 if any of them failed and 2 if the arguments or the manifest are invalid.
+    '''
+    arguments = parser()
+    args = arguments.parse_args(argv)
+    target = [args.country, args.start_date, args.end_date, args.day]
+
+    if args.log_level is not None:
+        logging.basicConfig(level= args.log_level, format= "%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    if args.manifest is not None:
+        if any(value is not None for value in target):
+            arguments.error("use either a manifest or the single target arguments, not both")
+        try:
+            jobs = load_manifest(args.manifest)
+        except (OSError, ValueError, ImportError) as error:
+            arguments.error(str(error))
+    elif any(value is None for value in target):
+        arguments.error("country, start_date, end_date and day are required without a manifest")
+    else:
+        jobs = [{key: value for (key, value) in vars(args).items() if key in JOB_KEYS}]
+
+    if args.provider == "rules":
+        from .providers import RuleProvider
+        client = RuleProvider()
+    else:
+        from .nager import CACHE_DIR, NagerClient
+        client = NagerClient(cache_dir= args.cache_dir or CACHE_DIR, offline= args.offline)
+
+    if len(jobs) == 1:
+        try:
+            log(f"{job_name(jobs[0])}: {run_job(jobs[0], client, args.quiet)}", args.quiet)
+            return 0
+        except Exception as error:
+            failed(job_name(jobs[0]), error)
+            return 1
+
+    failures = run_jobs(jobs, client, args.workers, args.quiet)
+    log({"Jobs": len(jobs), "Failed": failures}, args.quiet)
+    return 0 if failures == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import functools
+import logging
+import time
+
+logger = logging.getLogger("SeasonalityScript")
+# Without a handler of its own, the errors reach Python's last resort handler and are written to stderr even when quiet
+logger.addHandler(logging.NullHandler())
+
+def configured(level: int = logging.INFO):
+    '''
+    :param level: int | logging level of the message. logging.INFO by default.
+
+    :returns: bool | whether a handler set up by the application (e.g. with logging.basicConfig) writes the messages of this level.
+    '''
+    if logger.isEnabledFor(level) == False:
+        return False
+    current = logger
+    while current is not None:
+        if any(not isinstance(handler, logging.NullHandler) and level >= handler.level for handler in current.handlers):
+            return True
+        current = current.parent if current.propagate else None
+    return False
+
+def log(message, quiet: bool = False, level: int = logging.INFO):
+    '''
+    Sends a progress message to the 'SeasonalityScript' logger. Unless quiet, the message is also printed
+    when no handler of the application writes it, so it's shown exactly once.
+
+    :param message: str | the message.
+    :param quiet: bool | doesn't print the message. False by default.
+    :param level: int | logging level of the message. logging.INFO by default.
+    '''
+    if quiet == False and configured(level) == False:
+        print(message)
+    logger.log(level, "%s", message)
+
+def emit(metrics, event: dict):
+    '''
+    Sends an event to the metrics hook and to the 'SeasonalityScript' logger (DEBUG level).
+
+    :param metrics: function | hook that receives every event, or None.
+    :param event: dict | the event. The 'event' key tells its kind ('stage', 'request' or 'cache').
+    '''
+    if metrics is not None:
+        metrics(event)
+    logger.debug("%s", event)
+
+def enabled(metrics):
+    '''
+    :param metrics: function | hook that receives every event, or None.
+
+    :returns: bool | whether events are sent anywhere. When they aren't, nothing is measured.
+    '''
+    return metrics is not None or logger.isEnabledFor(logging.DEBUG)
+
+def stage(frame: str = None):
+    '''
+    Decorator that measures a SeasonalityScript method and sends a 'stage' event with its duration and
+    the size of the DataFrame it built. Does nothing when the object is quiet and no events are sent.
+
+    :param frame: str | attribute holding the DataFrame built by the stage. The value returned by the method by default.
+    '''
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.quiet == True and not enabled(self.metrics):
+                return method(self, *args, **kwargs)
+
+            start = time.perf_counter()
+            result = method(self, *args, **kwargs)
+            seconds = time.perf_counter() - start
+            self.timings[method.__name__] = seconds
+
+            df = getattr(self, frame, None) if frame is not None else result
+            event = {"event": "stage", "stage": method.__name__, "country": self.country_id, "uk_country": self.uk_country,
+                     "seconds": seconds}
+            if len(getattr(df, "shape", ())) == 2:
+                (event["rows"], event["columns"]) = df.shape
+            emit(self.metrics, event)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,218 @@
+import json
+import os
+import shutil
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .instrumentation import emit, enabled
+from .providers import HolidayProvider, load_snapshot
+
+NAGER_URL = r'https://date.nager.at/api/v3'
+CACHE_DIR = os.environ.get("SEASONALITY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "SeasonalityScript"))
+
+# Country lists already retrieved in this process, by API root
+countries = {}
+countries_lock = threading.Lock()
+# When the list can't be retrieved, the bundled snapshot is used for this many seconds before trying again
+FALLBACK_SECONDS = 300
+fallbacks = {}
+
+class NagerClient(HolidayProvider):
+    def __init__(self, base_url: str = NAGER_URL, cache_dir: str = CACHE_DIR, ttl: int = 86400, offline: bool = False,
+                 workers: int = 8, retries: int = 3, backoff: float = 0.5, metrics = None):
+        '''
+        Client for the Nager.Date API that keeps a local copy of every response.
+
+        Responses are stored as JSON files that mirror the API paths (e.g. PublicHolidays/2023/US.json).
+        Holidays for past years never expire. The country list and the holidays for the current and
+        future years are downloaded again once they are older than the TTL.
+
+        :param base_url: str | root of the API. Point it to a local server to run without internet access.
+        :param cache_dir: str | folder the responses are stored in. None disables the cache.
+        :param ttl: int | seconds before the country list and the current and future years expire. 1 day by default.
+        :param offline: bool | only serves responses from the cache and never makes requests. False by default.
+        :param workers: int | maximum number of years downloaded at the same time. 8 by default.
+        :param retries: int | times a failed request is retried. 3 by default.
+        :param backoff: float | backoff factor between retries, in seconds (0.5s, 1s, 2s...). 0.5 by default.
+        :param metrics: function | hook that receives a dict for every request and cache lookup. It isn't sent to other processes. None by default.
+        '''
+        self.base_url = base_url.rstrip("/")
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.offline = offline
+        self.workers = workers
+        self.countries = None
+        self.metrics = metrics
+
+        # Counters shared by all the threads that use the client
+        self.stats = {"requests": 0, "request_seconds": 0.0, "cache_hits": 0, "cache_misses": 0}
+        self.lock = threading.Lock()
+
+        # Reuses the connections between requests and retries the failed ones with an exponential backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections= 1, pool_maxsize= workers,
+                              max_retries= Retry(total= retries, backoff_factor= backoff, status_forcelist= [429, 500, 502, 503, 504]))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __getstate__(self):
+        # Locks and hooks can't be sent to other processes
+        state = self.__dict__.copy()
+        del state["lock"]
+        state["metrics"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def count(self, **counters):
+        '''
+        Adds to the stats counters.
+        '''
+        with self.lock:
+            for (name, value) in counters.items():
+                self.stats[name] += value
+
+    def get_available_countries(self):
+        '''
+        Retrieves the country list once per process. Falls back to the bundled snapshot when the list
+        isn't cached and the API can't be reached (or the client is offline). The snapshot is then used by
+        every client of the process for FALLBACK_SECONDS, and by this client from then on.
+
+        :returns: list | all available countries, as returned by the AvailableCountries endpoint.
+        '''
+        # The list is kept in memory, so the clients of this process only retrieve it once
+        if self.countries is None:
+            with countries_lock:
+                if self.base_url in countries:
+                    self.countries = countries[self.base_url]
+                elif self.base_url in fallbacks and time.monotonic() - fallbacks[self.base_url][0] < FALLBACK_SECONDS:
+                    # The API failed recently, so the clients don't wait for the retries again
+                    self.countries = fallbacks[self.base_url][1]
+                else:
+                    try:
+                        countries[self.base_url] = self.get("AvailableCountries", expires= True)
+                        self.countries = countries[self.base_url]
+                    except (requests.RequestException, LookupError):
+                        fallbacks[self.base_url] = (time.monotonic(), load_snapshot())
+                        self.countries = fallbacks[self.base_url][1]
+        return self.countries
+
+    def get_public_holidays(self, year: int, country_code: str):
+        '''
+        :param year: int | year to retrieve the holidays from.
+        :param country_code: str | two letter code for the country.
+
+        :returns: list | all the holidays of that year, as returned by the PublicHolidays endpoint.
+        '''
+        return self.get(f"PublicHolidays/{year}/{country_code}", expires= int(year) >= datetime.now().year)
+
+    def get_public_holidays_range(self, years, country_code: str):
+        '''
+        Retrieves the holidays of several years concurrently.
+
+        :param years: list | years to retrieve the holidays from.
+        :param country_code: str | two letter code for the country.
+
+        :returns: list | the response of each year, in the same order as the years.
+        '''
+        years = list(years)
+        if len(years) <= 1 or self.workers <= 1:
+            return [self.get_public_holidays(year, country_code) for year in years]
+
+        with ThreadPoolExecutor(max_workers= min(self.workers, len(years))) as executor:
+            return list(executor.map(lambda year: self.get_public_holidays(year, country_code), years))
+
+    def get(self, endpoint: str, expires: bool = True):
+        '''
+        Returns the response of an endpoint, reading it from the cache when it's still valid.
+
+        :param endpoint: str | path of the endpoint relative to the root of the API.
+        :param expires: bool | whether the cached response expires after the TTL.
+
+        :returns: list | parsed JSON response.
+        '''
+        path = self.cache_path(endpoint)
+        cached = path is not None and os.path.exists(path)
+
+        if cached and (self.offline or not expires or time.time() - os.path.getmtime(path) < self.ttl):
+            self.count(cache_hits= 1)
+            if enabled(self.metrics):
+                emit(self.metrics, {"event": "cache", "endpoint": endpoint, "hit": True})
+            with open(path, "rb") as file:
+                return json.loads(file.read())
+
+        if path is not None:
+            self.count(cache_misses= 1)
+            if enabled(self.metrics):
+                emit(self.metrics, {"event": "cache", "endpoint": endpoint, "hit": False})
+        if self.offline:
+            raise LookupError(f"{endpoint} is not cached and the client is offline")
+
+        start = time.perf_counter()
+        try:
+            connection = self.session.get(f"{self.base_url}/{endpoint}")
+            connection.raise_for_status()
+        except requests.RequestException:
+            self.count(requests= 1, request_seconds= time.perf_counter() - start)
+            # Falls back to an expired copy rather than failing the whole run
+            if cached:
+                with open(path, "rb") as file:
+                    return json.loads(file.read())
+            raise
+
+        seconds = time.perf_counter() - start
+        self.count(requests= 1, request_seconds= seconds)
+        if enabled(self.metrics):
+            emit(self.metrics, {"event": "request", "endpoint": endpoint, "status": connection.status_code, "seconds": seconds})
+
+        response = json.loads(connection.content)
+        if path is not None:
+            self.store(path, connection.content)
+        return response
+
+    def cache_path(self, endpoint: str):
+        '''
+        :returns: str | file the response of an endpoint is cached in, or None if the cache is disabled.
+        '''
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, *endpoint.split("/")) + ".json"
+
+    def store(self, path: str, content: bytes):
+        '''
+        Writes a response to the cache. The file is replaced atomically so concurrent runs never read half a file.
+        '''
+        os.makedirs(os.path.dirname(path), exist_ok= True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(content)
+        os.replace(temporary, path)
+
+    def warm(self, fixtures: str):
+        '''
+        Pre-warms the cache from a local folder laid out like the cache (e.g. PublicHolidays/2023/US.json).
+
+        :param fixtures: str | folder containing the recorded responses.
+
+        :returns: int | number of responses copied to the cache.
+        '''
+        if self.cache_dir is None:
+            raise ValueError("The cache is disabled")
+
+        copied = 0
+        for (folder, _, files) in os.walk(fixtures):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                source = os.path.join(folder, name)
+                target = os.path.join(self.cache_dir, os.path.relpath(source, fixtures))
+                os.makedirs(os.path.dirname(target), exist_ok= True)
+                shutil.copyfile(source, target)
+                copied += 1
+        return copied
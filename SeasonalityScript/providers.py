@@ -0,0 +1,228 @@
+import calendar
+import json
+import os
+from datetime import date, timedelta
+
+DAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+# Copy of the AvailableCountries endpoint shipped with the package
+COUNTRIES_SNAPSHOT = os.path.join(os.path.dirname(__file__), "countries.json")
+
+# Holiday names fixed for every source, by country code (e.g. accents the modeling tool can't read)
+HOLIDAY_NAMES = {"AR": {'''General José de San Martín Memorial Day''': '''General Jose de San Martin Memorial Day''',
+                        '''Anniversary of the Passing of General Martín Miguel de Güemes''': '''Anniversary of the Passing of General Martin Miguel de Güemes'''},
+                 "GB": {'''Queen’s Platinum Jubilee BH''': '''Queen's Platinum Jubilee BH''', '''Queen’s State Funeral BH''': '''Queen's State Funeral BH''',
+                        "Early May Bank Holiday BH": "Early May BH", "Spring Bank Holiday BH": "Spring BH", "Coronation Bank Holiday BH": "Coronation BH"}}
+
+# Rules of the local calendar. Each holiday is either:
+#   - "fixed": the same month and day every year.
+#   - "weekday": the nth weekday of the month (n= -1 is the last one). With a day, it's the nth weekday on or
+#     after that day (or on or before it when n is negative).
+#   - "easter": a number of days before or after Easter Sunday.
+# "observed" moves weekend holidays to the nearest weekday ("nearest") or to the next free weekday ("monday"),
+# "unless" keeps the day the weekday rule counts from when it falls on that weekday instead, and "since"/"until"
+# limit the years a holiday exists (one-off holidays are "fixed" rules with the same since and until, and moved
+# holidays are split). Names follow the Nager.Date API. Only the national holidays are included, plus the regional
+# ones of the UK countries (e.g. Columbus Day is regional in the US, so it isn't).
+ENGLAND = ["GB-ENG", "GB-WLS", "GB-NIR"]
+RULES = {"US": [{"name": "New Year's Day", "rule": "fixed", "month": 1, "day": 1, "observed": "nearest"},
+                {"name": "Martin Luther King, Jr. Day", "rule": "weekday", "month": 1, "weekday": "MON", "n": 3},
+                {"name": "Washington's Birthday", "localName": "Presidents Day", "rule": "weekday", "month": 2, "weekday": "MON", "n": 3},
+                {"name": "Memorial Day", "rule": "weekday", "month": 5, "weekday": "MON", "n": -1},
+                {"name": "Juneteenth National Independence Day", "rule": "fixed", "month": 6, "day": 19, "observed": "nearest", "since": 2021},
+                {"name": "Independence Day", "rule": "fixed", "month": 7, "day": 4, "observed": "nearest"},
+                {"name": "Labour Day", "localName": "Labor Day", "rule": "weekday", "month": 9, "weekday": "MON", "n": 1},
+                {"name": "Veterans Day", "rule": "fixed", "month": 11, "day": 11, "observed": "nearest"},
+                {"name": "Thanksgiving Day", "rule": "weekday", "month": 11, "weekday": "THU", "n": 4},
+                {"name": "Christmas Day", "rule": "fixed", "month": 12, "day": 25, "observed": "nearest"}],
+         "GB": [{"name": "New Year's Day", "rule": "fixed", "month": 1, "day": 1, "observed": "monday"},
+                {"name": "2 January", "rule": "fixed", "month": 1, "day": 2, "observed": "monday", "counties": ["GB-SCT"]},
+                {"name": "Saint Patrick's Day", "rule": "fixed", "month": 3, "day": 17, "observed": "monday", "counties": ["GB-NIR"]},
+                {"name": "Good Friday", "rule": "easter", "offset": -2},
+                {"name": "Easter Monday", "rule": "easter", "offset": 1, "counties": ENGLAND},
+                {"name": "Early May Bank Holiday", "rule": "weekday", "month": 5, "weekday": "MON", "n": 1, "types": ["Public", "Bank"], "until": 2019},
+                {"name": "Early May Bank Holiday", "rule": "fixed", "month": 5, "day": 8, "types": ["Public", "Bank"], "since": 2020, "until": 2020},
+                {"name": "Early May Bank Holiday", "rule": "weekday", "month": 5, "weekday": "MON", "n": 1, "types": ["Public", "Bank"], "since": 2021},
+                {"name": "Coronation Bank Holiday", "rule": "fixed", "month": 5, "day": 8, "types": ["Public", "Bank"], "since": 2023, "until": 2023},
+                {"name": "Spring Bank Holiday", "rule": "weekday", "month": 5, "weekday": "MON", "n": -1, "types": ["Public", "Bank"], "until": 2021},
+                {"name": "Spring Bank Holiday", "rule": "fixed", "month": 6, "day": 2, "types": ["Public", "Bank"], "since": 2022, "until": 2022},
+                {"name": "Spring Bank Holiday", "rule": "weekday", "month": 5, "weekday": "MON", "n": -1, "types": ["Public", "Bank"], "since": 2023},
+                {"name": "Queen’s Platinum Jubilee", "rule": "fixed", "month": 6, "day": 3, "types": ["Public", "Bank"], "since": 2022, "until": 2022},
+                {"name": "Battle of the Boyne", "rule": "fixed", "month": 7, "day": 12, "observed": "monday", "counties": ["GB-NIR"]},
+                {"name": "Summer Bank Holiday", "rule": "weekday", "month": 8, "weekday": "MON", "n": 1, "counties": ["GB-SCT"]},
+                {"name": "Summer Bank Holiday", "rule": "weekday", "month": 8, "weekday": "MON", "n": -1, "counties": ENGLAND},
+                {"name": "Queen’s State Funeral", "rule": "fixed", "month": 9, "day": 19, "types": ["Public", "Bank"], "since": 2022, "until": 2022},
+                {"name": "Saint Andrew's Day", "rule": "fixed", "month": 11, "day": 30, "observed": "monday", "counties": ["GB-SCT"]},
+                {"name": "Christmas Day", "rule": "fixed", "month": 12, "day": 25, "observed": "monday"},
+                {"name": "Boxing Day", "rule": "fixed", "month": 12, "day": 26, "observed": "monday"}],
+         "IE": [{"name": "New Year's Day", "rule": "fixed", "month": 1, "day": 1, "observed": "monday"},
+                {"name": "Saint Brigid's Day", "rule": "weekday", "month": 2, "weekday": "MON", "n": 1, "unless": "FRI", "since": 2023},
+                {"name": "Saint Patrick's Day", "rule": "fixed", "month": 3, "day": 17, "observed": "monday"},
+                {"name": "Easter Monday", "rule": "easter", "offset": 1},
+                {"name": "May Day", "rule": "weekday", "month": 5, "weekday": "MON", "n": 1},
+                {"name": "June Bank Holiday", "rule": "weekday", "month": 6, "weekday": "MON", "n": 1},
+                {"name": "August Bank Holiday", "rule": "weekday", "month": 8, "weekday": "MON", "n": 1},
+                {"name": "October Bank Holiday", "rule": "weekday", "month": 10, "weekday": "MON", "n": -1},
+                {"name": "Christmas Day", "rule": "fixed", "month": 12, "day": 25, "observed": "monday"},
+                {"name": "St. Stephen's Day", "rule": "fixed", "month": 12, "day": 26, "observed": "monday"}],
+         "CA": [{"name": "New Year's Day", "rule": "fixed", "month": 1, "day": 1},
+                {"name": "Good Friday", "rule": "easter", "offset": -2},
+                {"name": "Victoria Day", "rule": "weekday", "month": 5, "weekday": "MON", "n": -1, "day": 24},
+                {"name": "Canada Day", "rule": "fixed", "month": 7, "day": 1},
+                {"name": "Labour Day", "rule": "weekday", "month": 9, "weekday": "MON", "n": 1},
+                {"name": "Christmas Day", "rule": "fixed", "month": 12, "day": 25}]}
+
+def easter(year: int):
+    '''
+    :param year: int | year of the Gregorian calendar.
+
+    :returns: datetime.date | Easter Sunday of that year (anonymous Gregorian algorithm).
+    '''
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+def nth_weekday(year: int, month: int, weekday: str, n: int, day: int = None):
+    '''
+    :param weekday: str | day of the week (i.e. MON or TUE...).
+    :param n: int | 1 for the first one, 2 for the second one... and -1 for the last one.
+    :param day: int | counts from this day of the month instead of the start (or end, when n is negative). None by default.
+
+    :returns: datetime.date | the nth weekday of the month.
+    '''
+    weekday = DAYS.index(weekday)
+    if n > 0:
+        first = date(year, month, day or 1)
+        return first + timedelta(days= (weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month, day or calendar.monthrange(year, month)[1])
+    return last - timedelta(days= (last.weekday() - weekday) % 7 + 7 * (-n - 1))
+
+def load_snapshot():
+    '''
+    :returns: list | the bundled copy of the AvailableCountries endpoint.
+    '''
+    with open(COUNTRIES_SNAPSHOT, "rb") as file:
+        return json.loads(file.read())
+
+class HolidayProvider:
+    '''
+    Source of bank holidays. Every source returns the same records as the Nager.Date API: one dict per
+    holiday with its 'date' (YYYY-MM-DD), 'name', 'counties' (None for national holidays) and 'types'.
+
+    Subclasses implement get_available_countries() and get_public_holidays().
+    '''
+    def get_available_countries(self):
+        '''
+        :returns: list | dicts with the 'countryCode' and 'name' of every country available.
+        '''
+        raise NotImplementedError
+
+    def get_public_holidays(self, year: int, country_code: str):
+        '''
+        :param year: int | year to retrieve the holidays from.
+        :param country_code: str | two letter code for the country.
+
+        :returns: list | all the holidays of that year.
+        '''
+        raise NotImplementedError
+
+    def get_public_holidays_range(self, years, country_code: str):
+        '''
+        :param years: list | years to retrieve the holidays from.
+        :param country_code: str | two letter code for the country.
+
+        :returns: list | the holidays of each year, in the same order as the years.
+        '''
+        return [self.get_public_holidays(year, country_code) for year in years]
+
+    def get_holiday_records(self, years, country_code: str):
+        '''
+        Same as get_public_holidays_range(), with the names in HOLIDAY_NAMES fixed.
+
+        :returns: list | the holidays of each year, in the same order as the years.
+        '''
+        names = HOLIDAY_NAMES.get(country_code, {})
+        return [[{**item, "name": names[item["name"]]} if item["name"] in names else item for item in response]
+                for response in self.get_public_holidays_range(years, country_code)]
+
+class RuleProvider(HolidayProvider):
+    def __init__(self, rules: dict = None):
+        '''
+        Computes the holidays locally from calendar rules, without any requests.
+
+        :param rules: dict | list of rules of each country code, in the same format as RULES. RULES by default.
+        '''
+        self.rules = rules if rules is not None else RULES
+        self.holidays = {}
+
+    def get_available_countries(self):
+        '''
+        :returns: list | dicts with the 'countryCode' and 'name' of every country with rules.
+        '''
+        names = {item["countryCode"]: item["name"] for item in load_snapshot()}
+        return [{"countryCode": code, "name": names.get(code, code)} for code in self.rules]
+
+    def get_public_holidays(self, year: int, country_code: str):
+        '''
+        :param year: int | year to compute the holidays of.
+        :param country_code: str | two letter code for the country.
+
+        :returns: list | all the holidays of that year, sorted by date.
+        '''
+        if country_code not in self.rules:
+            raise LookupError(f"There are no holiday rules for {country_code}")
+
+        year = int(year)
+        if (year, country_code) not in self.holidays:
+            rules = [rule for rule in self.rules[country_code]
+                     if rule.get("since", year) <= year <= rule.get("until", year)]
+            dates = [self.rule_date(rule, year) for rule in rules]
+
+            # National weekday holidays keep their date, then the weekend ones are moved to the next weekday that isn't
+            # already a holiday in the same counties (national holidays clash with all of them). Regional holidays go
+            # last, so they move out of the way of the national ones (e.g. Scotland's 2 January moves to the 3rd
+            # when New Year's Day is observed on the 2nd)
+            national = [rule.get("counties") is None for rule in rules]
+            taken = [(day, None) for (day, is_national) in zip(dates, national) if is_national and day.weekday() < 5]
+            for position in sorted(range(len(rules)), key= lambda position: not national[position]):
+                (rule, day) = (rules[position], dates[position])
+                clash = lambda day: any(day == other and (counties is None or rule.get("counties") is None or set(counties) & set(rule["counties"]))
+                                        for (other, counties) in taken)
+                if day.weekday() >= 5 and rule.get("observed") == "nearest":
+                    day += timedelta(days= -1 if day.weekday() == 5 else 1)
+                elif rule.get("observed") == "monday" and (day.weekday() >= 5 or (not national[position] and clash(day))):
+                    day += timedelta(days= 1)
+                    while day.weekday() >= 5 or clash(day):
+                        day += timedelta(days= 1)
+                if not national[position] or dates[position].weekday() >= 5:
+                    taken.append((day, rule.get("counties")))
+                dates[position] = day
+
+            self.holidays[(year, country_code)] = sorted(
+                ({"date": day.isoformat(), "localName": rule.get("localName", rule["name"]), "name": rule["name"],
+                  "countryCode": country_code, "fixed": rule["rule"] == "fixed", "global": rule.get("counties") is None,
+                  "counties": rule.get("counties"), "launchYear": rule.get("since"), "types": rule.get("types", ["Public"])}
+                 for (rule, day) in zip(rules, dates)), key= lambda item: item["date"])
+        return self.holidays[(year, country_code)]
+
+    def rule_date(self, rule: dict, year: int):
+        '''
+        :returns: datetime.date | the date a rule falls on in a year, before moving weekend holidays.
+        '''
+        if rule["rule"] == "fixed":
+            return date(year, rule["month"], rule["day"])
+        elif rule["rule"] == "weekday":
+            first = date(year, rule["month"], rule.get("day") or 1)
+            if DAYS[first.weekday()] == rule.get("unless"):
+                return first
+            return nth_weekday(year, rule["month"], rule["weekday"], rule["n"], rule.get("day"))
+        elif rule["rule"] == "easter":
+            return easter(year) + timedelta(days= rule["offset"])
+        raise ValueError(f"Unknown rule {rule['rule']} for {rule['name']}")
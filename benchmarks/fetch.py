@@ -0,0 +1,29 @@
+import json
+import tempfile
+import time
+import requests
+from SeasonalityScript import NagerClient
+from server import FixtureServer, write_fixtures
+
+YEARS = range(1994, 2024)
+DELAY = 0.05
+
+if __name__ == "__main__":
+    fixtures = tempfile.mkdtemp()
+    write_fixtures(fixtures, ["US"], YEARS)
+
+    with FixtureServer(fixtures, delay= DELAY) as server:
+        # Reference: the sequential loop get_holidays used to run
+        start = time.perf_counter()
+        expected = [json.loads(requests.get(f"{server.url}/PublicHolidays/{year}/US").content) for year in YEARS]
+        sequential_time = time.perf_counter() - start
+
+        for workers in [1, 4, 8, 16]:
+            client = NagerClient(base_url= server.url, cache_dir= None, workers= workers)
+            start = time.perf_counter()
+            result = client.get_public_holidays_range(YEARS, "US")
+            pooled_time = time.perf_counter() - start
+
+            assert result == expected
+            print({"Years": len(YEARS), "Delay (s)": DELAY, "Workers": workers, "Sequential (s)": round(sequential_time, 3),
+                   "Pooled (s)": round(pooled_time, 3), "Speedup": round(sequential_time / pooled_time, 1)})
@@ -0,0 +1,47 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from SeasonalityScript import SeasonalityScript, NagerClient
+from server import FixtureServer, write_fixtures
+
+READERS = {"csv": lambda path: pd.read_csv(path, header= None),
+           "parquet": lambda path: pq.read_table(path),
+           "feather": lambda path: feather.read_table(path),
+           "arrow": lambda path: pa.ipc.open_file(path).read_all()}
+
+if __name__ == "__main__":
+    fixtures = tempfile.mkdtemp()
+    write_fixtures(fixtures, ["US"], range(1974, 2024))
+
+    with FixtureServer(fixtures) as server, contextlib.redirect_stdout(io.StringIO()):
+        data = SeasonalityScript("US", "01/01/1974", "31/12/2023", "MON", client= NagerClient(base_url= server.url, cache_dir= None))
+        data.build_dataframe()
+        data.get_holidays()
+        data.build_weekly_dummies()
+        data.build_monthly_dummies()
+        data.join_dataframes()
+
+    outpath = tempfile.mkdtemp()
+    for long_format in [False, True]:
+        for file_format in READERS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                if file_format == "csv":
+                    data.write_csv(outpath, long_format)
+                else:
+                    data.write_table(outpath, file_format, long_format)
+                write_time = time.perf_counter() - start
+
+            path = os.path.join(outpath, "Seasonality." + file_format)
+            start = time.perf_counter()
+            READERS[file_format](path)
+            read_time = time.perf_counter() - start
+
+            print({"Years": 50, "Long format": long_format, "Format": file_format, "Size (KB)": round(os.path.getsize(path) / 1024, 1),
+                   "Write (s)": round(write_time, 4), "Read (s)": round(read_time, 4)})
@@ -0,0 +1,48 @@
+import time
+import pandas as pd
+from SeasonalityScript import holiday_indicators
+
+def build_holidays(dates: pd.Series):
+    '''
+    Builds a synthetic holiday dictionary with ten fixed-date holidays per year.
+
+    :param dates: pandas.Series | daily dates covered by the benchmark.
+
+    :returns: dict | bank holiday names and the list of dates each one falls on.
+    '''
+    holidays = {}
+    for year in range(dates.iloc[0].year, dates.iloc[-1].year + 1):
+        for month in range(1, 11):
+            holidays.setdefault(f"Holiday {month}", []).append(pd.Timestamp(year, month, 15))
+    return holidays
+
+def iterrows_indicators(df: pd.DataFrame, holidays: dict):
+    '''
+    Reference implementation: the row by row scan get_holidays used to run.
+    '''
+    for holiday in holidays:
+        new_column = []
+        for (index, row) in df.iterrows():
+            if row["date"] in holidays[holiday][:]:
+                new_column.append(1)
+            else:
+                new_column.append(0)
+        df['Seasonality-' + holiday] = new_column
+    return df
+
+if __name__ == "__main__":
+    for years in [1, 10, 50]:
+        df = pd.date_range(start= "2000-01-01", periods= 365 * years, freq= "D").to_frame(index= False, name= 'date')
+        holidays = build_holidays(df["date"])
+
+        start = time.perf_counter()
+        expected = iterrows_indicators(df.copy(), holidays)
+        iterrows_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = pd.concat([df, holiday_indicators(df["date"], holidays)], axis= 1)
+        vectorized_time = time.perf_counter() - start
+
+        assert result.equals(expected)
+        print({"Years": years, "iterrows (s)": round(iterrows_time, 4), "vectorized (s)": round(vectorized_time, 4),
+               "Speedup": round(iterrows_time / vectorized_time, 1)})
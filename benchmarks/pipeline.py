@@ -0,0 +1,189 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from SeasonalityScript import SeasonalityScript, NagerClient, monthly_dummies, week_bins, weekly_dummies
+from server import FixtureServer, REGIONS, write_fixtures
+
+STAGES = ["build_dataframe", "get_holidays", "build_weekly_dummies", "build_monthly_dummies", "join_dataframes", "write_csv"]
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+COUNTRIES = ["US", "GB", "IE", "CA", "AU", "NZ", "DE", "FR", "ES", "IT"]
+# Every memoized calendar function of the package
+CALENDARS = [week_bins, weekly_dummies, monthly_dummies]
+
+def scenarios():
+    '''
+    :returns: list | (name, targets, start_date, end_date, week_ending) for every combination of the sweep.
+    '''
+    result = []
+    for years in [1, 10, 50]:
+        for size in [1, 10]:
+            for uk in [False, True]:
+                for week_ending in [False, True]:
+                    if uk == False:
+                        targets = [(country, None) for country in COUNTRIES[:size]]
+                    else:
+                        targets = [("GB", REGIONS[i % len(REGIONS)]) for i in range(size)]
+                    name = f"{years}y-{size}{'uk' if uk else 'c'}-{'we' if week_ending else 'wc'}"
+                    result.append((name, targets, f"01/01/{2024 - years}", "31/12/2023", week_ending))
+    return result
+
+def clear_calendars():
+    '''
+    Empties the caches of the week boundaries and the weekly and monthly dummies.
+    '''
+    for function in CALENDARS:
+        function.cache_clear()
+
+def run_stages(targets: list, start_date: str, end_date: str, week_ending: bool, client: NagerClient, outpath: str, measure):
+    '''
+    Runs every stage of get_csv for all the targets and adds up the measurements of each stage.
+
+    :param measure: function | context manager factory that receives the stage name and records its measurements.
+    '''
+    for (country_code, uk_country) in targets:
+        # Clears the memoized calendar so every run builds it
+        clear_calendars()
+
+        data = SeasonalityScript(country_code, start_date, end_date, "MON", uk_country, week_ending, client)
+        for stage in STAGES:
+            with measure(stage):
+                if stage == "write_csv":
+                    data.write_csv(outpath)
+                else:
+                    getattr(data, stage)()
+
+def machine():
+    '''
+    :returns: dict | the machine and Python version the benchmark runs on. Wall times are only compared on the same one.
+    '''
+    return {"host": platform.node(), "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(),
+            "python": platform.python_version()}
+
+def benchmark(targets: list, start_date: str, end_date: str, week_ending: bool, client: NagerClient, repeat: int = 3):
+    '''
+    :returns: dict | per stage wall time (best of the repeats), peak memory and memory blocks still allocated at the end of the stage.
+    '''
+    outpath = tempfile.mkdtemp()
+    results = {stage: {"time": float("inf"), "peak": 0, "live_blocks": 0} for stage in STAGES}
+
+    ## Wall time, without tracing the memory
+    for _ in range(repeat):
+        times = dict.fromkeys(STAGES, 0.0)
+
+        @contextlib.contextmanager
+        def timer(stage):
+            start = time.perf_counter()
+            yield
+            times[stage] += time.perf_counter() - start
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_stages(targets, start_date, end_date, week_ending, client, outpath, timer)
+        for stage in STAGES:
+            results[stage]["time"] = min(results[stage]["time"], times[stage])
+
+    ## Peak memory and number of memory blocks still allocated after each stage (tracemalloc only sees the live
+    ## blocks, not how many allocations were made and freed during the stage)
+    @contextlib.contextmanager
+    def tracer(stage):
+        tracemalloc.start()
+        yield
+        (current, peak) = tracemalloc.get_traced_memory()
+        blocks = sum(statistic.count for statistic in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.stop()
+        results[stage]["peak"] = max(results[stage]["peak"], peak)
+        results[stage]["live_blocks"] += blocks
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_stages(targets, start_date, end_date, week_ending, client, outpath, tracer)
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float, floor: float, memory_tolerance: float, memory_floor: float):
+    '''
+    :param tolerance: float | allowed slowdown (1.0 is twice as slow).
+    :param floor: float | slowdowns under this many seconds are ignored.
+    :param memory_tolerance: float | allowed growth of the peak memory (0.5 is 50% more).
+    :param memory_floor: float | peak memory growths under this many KB are ignored.
+
+    :returns: list | stages whose wall time or peak memory grew more than allowed against the baseline.
+    '''
+    regressions = []
+    for (name, stages) in results.items():
+        for (stage, result) in stages.items():
+            if name not in baseline or stage not in baseline[name]:
+                continue
+            expected = baseline[name][stage]["time"]
+            if result["time"] > expected * (1 + tolerance) and result["time"] - expected > floor:
+                regressions.append(f"{name} {stage}: {result['time']:.4f}s (baseline {expected:.4f}s)")
+            expected = baseline[name][stage]["peak"]
+            if result["peak"] > expected * (1 + memory_tolerance) and (result["peak"] - expected) / 1024 > memory_floor:
+                regressions.append(f"{name} {stage}: {result['peak'] / 1024:.1f}KB peak memory (baseline {expected / 1024:.1f}KB)")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description= "Benchmarks every stage of get_csv against recorded Nager.Date responses.")
+    parser.add_argument("--record", action= "store_true", help= "records the real API responses used by the benchmark into benchmarks/fixtures")
+    parser.add_argument("--save-baseline", action= "store_true", help= "stores the results as the new baseline")
+    parser.add_argument("--filter", default= "", help= "only runs the scenarios whose name contains this text")
+    parser.add_argument("--repeat", type= int, default= 3, help= "runs used for the wall time (the best one is kept)")
+    parser.add_argument("--tolerance", type= float, default= 1.0, help= "allowed slowdown against the baseline (1.0 is twice as slow)")
+    parser.add_argument("--floor", type= float, default= 0.02, help= "slowdowns under this many seconds are ignored")
+    parser.add_argument("--memory-tolerance", dest= "memory_tolerance", type= float, default= 0.5,
+                        help= "allowed growth of the peak memory against the baseline (0.5 is 50%% more)")
+    parser.add_argument("--memory-floor", dest= "memory_floor", type= float, default= 256,
+                        help= "peak memory growths under this many KB are ignored")
+    parser.add_argument("--require-baseline", dest= "require_baseline", action= "store_true",
+                        help= "fails with exit code 2 when there is no baseline to compare against")
+    args = parser.parse_args()
+
+    if args.record:
+        client = NagerClient(cache_dir= FIXTURES, workers= 4)
+        client.get_available_countries()
+        for country in COUNTRIES:
+            client.get_public_holidays_range(range(1974, 2024), country)
+        sys.exit(0)
+
+    # Uses synthetic responses when no recorded ones are available
+    fixtures = FIXTURES
+    if not os.path.exists(fixtures):
+        fixtures = tempfile.mkdtemp()
+        write_fixtures(fixtures, COUNTRIES, range(1974, 2024))
+
+    results = {}
+    with FixtureServer(fixtures) as server:
+        client = NagerClient(base_url= server.url, cache_dir= None)
+        for (name, targets, start_date, end_date, week_ending) in scenarios():
+            if args.filter not in name:
+                continue
+            results[name] = benchmark(targets, start_date, end_date, week_ending, client, args.repeat)
+            for (stage, result) in results[name].items():
+                print({"Scenario": name, "Stage": stage, "Time (s)": round(result["time"], 4),
+                       "Peak memory (KB)": round(result["peak"] / 1024, 1), "Live blocks": result["live_blocks"]})
+
+    # Baselines depend on the machine, so they aren't committed and are only compared on the machine that saved them
+    if args.save_baseline:
+        with open(BASELINE, "w") as file:
+            json.dump({"machine": machine(), "scenarios": results}, file, indent= 2)
+        sys.exit(0)
+
+    if os.path.exists(BASELINE) == False:
+        print(f"No baseline found at {BASELINE}, nothing was compared. Run with --save-baseline first.")
+        sys.exit(2 if args.require_baseline else 0)
+
+    with open(BASELINE) as file:
+        baseline = json.load(file)
+    if baseline.get("machine") != machine():
+        print(f"Not comparing: {BASELINE} was saved on {baseline.get('machine')}, not on {machine()}. Run with --save-baseline first.")
+        sys.exit(2)
+
+    regressions = compare(results, baseline["scenarios"], args.tolerance, args.floor, args.memory_tolerance, args.memory_floor)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+REGIONS = ["ENG", "SCT", "WLS", "NIR"]
+
+class Server(ThreadingHTTPServer):
+    request_queue_size = 128
+
+class FixtureServer:
+    def __init__(self, fixtures: str, delay: float = 0.0, status: int = None):
+        '''
+        Local stand-in for the Nager.Date API that serves recorded responses.
+
+        :param fixtures: str | folder laid out like the NagerClient cache (e.g. PublicHolidays/2023/US.json).
+        :param delay: float | seconds every response is delayed by, to simulate the network latency. 0 by default.
+        :param status: int | error code returned instead of the recorded responses, to simulate an outage (e.g. 503). None by default.
+        '''
+        self.fixtures = fixtures
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+
+    def __enter__(self):
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            # Keeps the connections alive, like the real API
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory= server.fixtures, **kwargs)
+
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.delay)
+                if server.status is not None:
+                    self.send_error(server.status)
+                    return
+                self.path = self.path.replace("/api/v3", "", 1) + ".json"
+                super().do_GET()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target= self.httpd.serve_forever, daemon= True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api/v3"
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def write_fixtures(folder: str, countries: list, years, holidays_per_year: int = 12):
+    '''
+    Writes synthetic Nager.Date responses, for benchmarks that don't need the real holidays.
+
+    :param folder: str | folder the responses are written to.
+    :param countries: list | two letter codes of the countries.
+    :param years: list | years to write the holidays for.
+    :param holidays_per_year: int | number of national holidays per year. 12 by default.
+    '''
+    import json
+
+    os.makedirs(folder, exist_ok= True)
+    with open(os.path.join(folder, "AvailableCountries.json"), "w") as file:
+        json.dump([{"countryCode": country, "name": country} for country in countries], file)
+
+    for year in years:
+        os.makedirs(os.path.join(folder, "PublicHolidays", str(year)), exist_ok= True)
+        for country in countries:
+            holidays = [{"date": f"{year}-{month:02d}-15", "localName": f"Holiday {month}", "name": f"Holiday {month}",
+                         "countryCode": country, "fixed": True, "global": True, "counties": None, "launchYear": None,
+                         "types": ["Public"]} for month in range(1, holidays_per_year + 1)]
+
+            # Adds regional holidays, like the ones the UK countries have
+            holidays += [{"date": f"{year}-{month:02d}-20", "localName": f"{region} Holiday {month}", "name": f"{region} Holiday {month}",
+                          "countryCode": country, "fixed": True, "global": False, "counties": [f"{country}-{region}"], "launchYear": None,
+                          "types": ["Public"]} for region in REGIONS for month in range(1, 4)]
+            with open(os.path.join(folder, "PublicHolidays", str(year), f"{country}.json"), "w") as file:
+                json.dump(holidays, file)
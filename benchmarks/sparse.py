@@ -0,0 +1,42 @@
+import contextlib
+import io
+import os
+import string
+import tempfile
+import time
+from SeasonalityScript import SeasonalityScript, NagerClient, get_batch_csv
+from server import FixtureServer, write_fixtures
+
+COUNTRIES = [f"A{letter}" for letter in string.ascii_uppercase] + [f"B{letter}" for letter in string.ascii_uppercase[:14]]
+YEARS = range(1974, 2024)
+
+if __name__ == "__main__":
+    fixtures = tempfile.mkdtemp()
+    write_fixtures(fixtures, COUNTRIES, YEARS)
+    client = NagerClient(cache_dir= tempfile.mkdtemp())
+    client.warm(fixtures)
+
+    with FixtureServer(fixtures) as server:
+        client.base_url = server.url
+        for sparse in [False, True]:
+            ## Memory of the joined DataFrames of all countries
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                frames = [SeasonalityScript(country, "01/01/1974", "31/12/2023", "MON", client= client, sparse= sparse).build()
+                          for country in COUNTRIES]
+                build_time = time.perf_counter() - start
+            memory = sum(df.memory_usage(deep= True).sum() for df in frames)
+
+            ## Size of the single long format file of all countries
+            outpath = tempfile.mkdtemp()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                get_batch_csv(COUNTRIES, "01/01/1974", "31/12/2023", "MON", outpath, single_file= True, client= client,
+                              sparse= sparse, nonzero_only= sparse)
+                write_time = time.perf_counter() - start
+            path = os.path.join(outpath, "Seasonality.csv")
+            size = os.path.getsize(path)
+            os.remove(path)
+
+            print({"Years": len(YEARS), "Countries": len(COUNTRIES), "Sparse": sparse, "Memory (MB)": round(float(memory) / 2 ** 20, 1),
+                   "Build (s)": round(build_time, 2), "Long file (MB)": round(size / 2 ** 20, 1), "Batch write (s)": round(write_time, 2)})
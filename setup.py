@@ -2,7 +2,6 @@ import setuptools
 from setuptools import setup
 
 setup(name= 'SeasonalityScript',
-      packages= ["SeasonalityScript"],
       version= '1.0.0',
       description= 'Bank holidays and seasonality variables creation',
       author= 'Nicolás Kossacoff',
@@ -10,7 +9,11 @@ setup(name= 'SeasonalityScript',
       install_requires= ["pandas>=2.0.0",
                          "numpy>=1.26.4",
                          "requests>=2.31.0"],
+      extras_require= {"arrow": ["pyarrow>=14.0.0"],
+                       "yaml": ["pyyaml>=6.0"]},
+      entry_points= {"console_scripts": ["seasonality = SeasonalityScript.cli:main"]},
       license= 'Apache',
       packages= setuptools.find_packages(),
+      package_data= {"SeasonalityScript": ["countries.json"]},
       classifiers= ["Programming Language :: Python :: 3", "License :: OSI Approved :: Apache License"],
       zip_safe= False)
\ No newline at end of file
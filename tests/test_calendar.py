@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from SeasonalityScript import DAYS, MONTHS, aggregate_weeks, monthly_dummies, week_bins, weekly_dummies
+
+# Random date ranges (first date, number of days and first day of the week), from a single day to a few years
+generator = np.random.default_rng(2023)
+RANGES = [(pd.Timestamp("1990-01-01") + pd.Timedelta(days= int(generator.integers(0, 40 * 365))), int(generator.integers(1, 1200)), DAYS[index % 7])
+          for index in range(400)]
+
+def resample(df: pd.DataFrame, day: str, week_ending: bool, how: str):
+    '''
+    Converts a daily DataFrame to weekly the way the class originally did.
+
+    :returns: pandas.DataFrame | 'date' column and the weekly aggregation of every other column.
+    '''
+    if week_ending == False:
+        df = df.resample(f"W-{day}", label= "left", closed= "left", on= "date").agg(how)
+    else:
+        df = df.resample(f"W-{day}", label= "right", closed= "right", on= "date").agg(how)
+    return df.reset_index()
+
+def daily(start_date, days: int):
+    '''
+    :returns: pandas.DataFrame | 'date' column with one row per day.
+    '''
+    return pd.date_range(start= start_date, periods= days, freq= "D").to_frame(index= False, name= "date")
+
+@pytest.mark.parametrize("start_date, days, day", RANGES)
+@pytest.mark.parametrize("week_ending", [False, True])
+def test_dummies_match_the_daily_resample(start_date, days, day, week_ending):
+    df = daily(start_date, days)
+    end_date = df["date"].iloc[-1]
+
+    # Daily 0/1 columns of the ISO week and month of every day, summed by week
+    weeks = pd.get_dummies(df["date"].dt.isocalendar().week.astype(int)).reindex(columns= range(1, 54), fill_value= False)
+    weeks.columns = [f"Seasonality-Week-Week {i}" for i in range(1, 54)]
+    months = pd.get_dummies(df["date"].dt.month).reindex(columns= range(1, 13), fill_value= False)
+    months.columns = [f"Seasonality-{month}" for month in MONTHS]
+    weekly = resample(pd.concat([df, weeks.astype(int), months.astype(int)], axis= 1), day, week_ending, "sum")
+
+    assert (week_bins(start_date, end_date, day, week_ending)[0] == weekly["date"]).all()
+    expected = weekly.drop(columns= "date")
+    for threshold in range(7):
+        result = pd.concat([weekly_dummies(start_date, end_date, day, week_ending, threshold),
+                            monthly_dummies(start_date, end_date, day, week_ending, threshold).drop(columns= "date")], axis= 1)
+        assert (result["date"] == weekly["date"]).all() and list(result.columns[1:]) == list(expected.columns)
+        np.testing.assert_array_equal(result.to_numpy()[:, 1:].astype(np.int64), (expected.to_numpy() > threshold).astype(np.int64))
+
+@pytest.mark.parametrize("start_date, days, day", RANGES[::8])
+@pytest.mark.parametrize("week_ending", [False, True])
+def test_aggregation_matches_the_daily_resample(start_date, days, day, week_ending):
+    df = daily(start_date, days)
+    end_date = df["date"].iloc[-1]
+    values = generator.integers(0, 5, size= (days, 3))
+    flags = generator.integers(0, 2, size= (days, 1))
+
+    (dates, weekly) = aggregate_weeks(start_date, end_date, day, week_ending, np.hstack([values, flags]), ["sum", "max", "mean", "majority"], 2)
+    expected = [resample(df.assign(value= values[:, column]), day, week_ending, how)
+                for (column, how) in enumerate(["sum", "max", "mean"])]
+    expected.append(resample(df.assign(value= flags[:, 0]), day, week_ending, "sum"))
+
+    assert (dates == expected[0]["date"]).all()
+    for column in [0, 1]:
+        np.testing.assert_array_equal(weekly[:, column], expected[column]["value"].to_numpy())
+    np.testing.assert_allclose(weekly[:, 2], expected[2]["value"].to_numpy(), rtol= 0, atol= 1e-12)
+    np.testing.assert_array_equal(weekly[:, 3], (expected[3]["value"] > 2).to_numpy())
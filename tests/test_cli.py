@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from SeasonalityScript.cli import main
+
+TARGET = ["US", "01/01/2021", "31/12/2022", "MON"]
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+def command(arguments: list):
+    '''
+    Runs the command in a new interpreter, as pytest sets up its own logging handlers.
+
+    :returns: subprocess.CompletedProcess | the finished command, with its stdout and stderr.
+    '''
+    return subprocess.run([sys.executable, "-m", "SeasonalityScript.cli"] + arguments + ["--provider", "rules"],
+                          capture_output= True, text= True, cwd= ROOT)
+
+def manifest(tmp_path, content):
+    '''
+    :returns: str | path of a JSON manifest with the content.
+    '''
+    path = os.path.join(tmp_path, "manifest.json")
+    with open(path, "w") as file:
+        json.dump(content, file)
+    return path
+
+def test_single_target(tmp_path):
+    assert main(TARGET + ["--provider", "rules", "--quiet", "--outpath", str(tmp_path)]) == 0
+    assert os.path.exists(os.path.join(tmp_path, "Seasonality.csv"))
+
+def test_failed_job(tmp_path):
+    # There are no holiday rules for Argentina
+    assert main(["AR"] + TARGET[1:] + ["--provider", "rules", "--quiet", "--outpath", str(tmp_path)]) == 1
+
+def test_manifest(tmp_path):
+    jobs = {"defaults": {"start_date": "01/01/2021", "end_date": "31/12/2022", "day": "MON", "outpath": str(tmp_path)},
+            "jobs": [{"country": "US"}, {"country": "GB", "uk_country": "SCT", "long_format": True}]}
+    assert main(["--manifest", manifest(tmp_path, jobs), "--provider", "rules", "--quiet", "--workers", "2"]) == 0
+    assert sorted(os.listdir(tmp_path)) == ["Seasonality_GB-SCT.csv", "Seasonality_US.csv", "manifest.json"]
+
+def test_manifest_with_a_failed_job(tmp_path):
+    jobs = [{"country": country, "start_date": "01/01/2021", "end_date": "31/12/2022", "day": "MON", "outpath": str(tmp_path)}
+            for country in ["US", "AR"]]
+    assert main(["--manifest", manifest(tmp_path, jobs), "--provider", "rules", "--quiet", "--workers", "2"]) == 1
+
+@pytest.mark.parametrize("content", [{"defaults": [], "jobs": [{"country": "US"}]}, {"jobs": ["US"]}, [], {"jobs": [{"country": "US"}]},
+                                     [{"country": "US", "start_date": "01/01/2021", "end_date": "31/12/2022", "day": "MON", "colour": "red"}]])
+def test_invalid_manifest(tmp_path, content):
+    with pytest.raises(SystemExit) as error:
+        main(["--manifest", manifest(tmp_path, content), "--provider", "rules", "--quiet"])
+    assert error.value.code == 2
+
+@pytest.mark.parametrize("arguments", [["US", "01/01/2021"], ["--manifest", "jobs.yaml"] + TARGET, ["--manifest", "missing.json"]])
+def test_invalid_arguments(arguments):
+    with pytest.raises(SystemExit) as error:
+        main(arguments + ["--provider", "rules"])
+    assert error.value.code == 2
+
+def test_quiet_failure_is_reported_once(tmp_path):
+    result = command(["AR"] + TARGET[1:] + ["--quiet", "--outpath", str(tmp_path)])
+    assert result.returncode == 1
+    assert result.stdout == ""
+    assert result.stderr.splitlines() == ["AR failed: KeyError('AR')"]
+
+@pytest.mark.parametrize("arguments", [[], ["--log-level", "INFO"]])
+def test_messages_are_shown_once(tmp_path, arguments):
+    result = command(TARGET + ["--outpath", str(tmp_path)] + arguments)
+    assert result.returncode == 0
+    assert (result.stdout + result.stderr).count("Creating object...") == 1
@@ -0,0 +1,42 @@
+import os
+import pytest
+from SeasonalityScript import RuleProvider, SeasonalityScript
+
+# First date, end date of the existing file and the new end date. Juneteenth starts in 2021,
+# so the second range brings a new bank holiday and the wide file is rewritten instead of appended to.
+# The last week of the third file only has one day, so every variable is 0 in it.
+RANGES = [("01/01/2015", "15/06/2017", "10/03/2019", "MON"),
+          ("01/01/2015", "12/06/2017", "10/03/2019", "MON"),
+          ("03/02/2018", "20/05/2020", "09/08/2022", "THU")]
+# The Fourier terms are the only float variables, which makes the whole 'value' column of long files float
+FEATURES = [None, ["quarter", "holiday_window", {"name": "fourier", "order": 1}]]
+
+def create(start_date: str, end_date: str, day: str, week_ending: bool, **kwargs):
+    '''
+    :returns: SeasonalityScript | quiet object that uses the local calendar rules for the US.
+    '''
+    return SeasonalityScript("US", start_date, end_date, day, week_ending= week_ending, client= RuleProvider(), quiet= True, **kwargs)
+
+def read(path: str):
+    '''
+    :returns: bytes | content of a file.
+    '''
+    with open(path, "rb") as file:
+        return file.read()
+
+@pytest.mark.parametrize("start_date, end_date, new_end_date, day", RANGES)
+@pytest.mark.parametrize("week_ending", [False, True])
+@pytest.mark.parametrize("long_format, nonzero_only", [(False, False), (True, False), (True, True)])
+@pytest.mark.parametrize("features", FEATURES)
+def test_extend_matches_full_run(tmp_path, start_date, end_date, new_end_date, day, week_ending, long_format, nonzero_only, features):
+    create(start_date, end_date, day, week_ending, features= features).get_csv(str(tmp_path), long_format, nonzero_only, "extended.csv")
+    create(start_date, new_end_date, day, week_ending, features= features).extend_csv(str(tmp_path), long_format, "extended.csv", nonzero_only)
+    create(start_date, new_end_date, day, week_ending, features= features).get_csv(str(tmp_path), long_format, nonzero_only, "full.csv")
+
+    assert read(os.path.join(tmp_path, "extended.csv")) == read(os.path.join(tmp_path, "full.csv"))
+
+@pytest.mark.parametrize("week_ending", [False, True])
+def test_extend_before_the_last_week(tmp_path, week_ending):
+    create("01/01/2015", "15/06/2017", "MON", week_ending).get_csv(str(tmp_path))
+    with pytest.raises(ValueError, match= "before the last week"):
+        create("01/01/2015", "01/06/2017", "MON", week_ending).extend_csv(str(tmp_path))
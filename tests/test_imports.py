@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+# Each order runs in a new interpreter, as the package is only imported once per process
+ORDERS = ["from SeasonalityScript import SeasonalityScript\nfrom SeasonalityScript.SeasonalityScript import weekly_dummies",
+          "from SeasonalityScript.SeasonalityScript import weekly_dummies\nfrom SeasonalityScript import SeasonalityScript"]
+
+@pytest.mark.parametrize("imports", ORDERS)
+def test_the_class_is_exported_in_any_import_order(imports):
+    code = imports + "\nimport SeasonalityScript as package\nassert isinstance(SeasonalityScript, type) and package.SeasonalityScript is SeasonalityScript"
+    subprocess.run([sys.executable, "-c", code], check= True, cwd= ROOT)
+
+def test_import_is_lazy():
+    code = "import sys, SeasonalityScript\nassert 'pandas' not in sys.modules and 'requests' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check= True, cwd= ROOT)
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+from datetime import datetime
+import pytest
+import requests
+from SeasonalityScript import NagerClient, nager
+from server import FixtureServer, write_fixtures
+
+PAST = 2000
+CURRENT = datetime.now().year
+
+@pytest.fixture
+def fixtures(tmp_path):
+    folder = str(tmp_path / "fixtures")
+    write_fixtures(folder, ["US"], [PAST, CURRENT])
+    return folder
+
+def expire(client: NagerClient, endpoint: str):
+    '''
+    Makes a cached response older than the TTL of the client.
+    '''
+    path = client.cache_path(endpoint)
+    old = time.time() - client.ttl - 60
+    os.utime(path, (old, old))
+
+def recorded(fixtures: str, year: int):
+    '''
+    :returns: list | the response the server has for the US holidays of a year.
+    '''
+    with open(os.path.join(fixtures, "PublicHolidays", str(year), "US.json"), "rb") as file:
+        return json.loads(file.read())
+
+def test_past_years_never_expire(fixtures, tmp_path):
+    with FixtureServer(fixtures) as server:
+        client = NagerClient(base_url= server.url, cache_dir= str(tmp_path / "cache"), ttl= 60)
+        assert client.get_public_holidays(PAST, "US") == recorded(fixtures, PAST)
+        expire(client, f"PublicHolidays/{PAST}/US")
+
+        assert client.get_public_holidays(PAST, "US") == recorded(fixtures, PAST)
+        assert server.requests == 1
+        assert client.stats["cache_hits"] == 1 and client.stats["cache_misses"] == 1
+
+def test_current_year_expires(fixtures, tmp_path):
+    with FixtureServer(fixtures) as server:
+        client = NagerClient(base_url= server.url, cache_dir= str(tmp_path / "cache"), ttl= 60)
+        client.get_public_holidays(CURRENT, "US")
+        client.get_public_holidays(CURRENT, "US")
+        assert server.requests == 1
+
+        expire(client, f"PublicHolidays/{CURRENT}/US")
+        assert client.get_public_holidays(CURRENT, "US") == recorded(fixtures, CURRENT)
+        assert server.requests == 2
+
+def test_offline_hit_and_miss(fixtures, tmp_path):
+    cache = str(tmp_path / "cache")
+    client = NagerClient(base_url= "http://127.0.0.1:9/api/v3", cache_dir= cache, offline= True)
+    assert client.warm(fixtures) == 3
+
+    # Expired responses are still served offline, and the missing ones fail without any request
+    expire(client, f"PublicHolidays/{CURRENT}/US")
+    assert client.get_public_holidays(CURRENT, "US") == recorded(fixtures, CURRENT)
+    with pytest.raises(LookupError):
+        client.get_public_holidays(PAST - 1, "US")
+    assert client.stats["requests"] == 0
+
+def test_stale_copy_when_the_server_fails(fixtures, tmp_path):
+    cache = str(tmp_path / "cache")
+    with FixtureServer(fixtures, status= 503) as server:
+        client = NagerClient(base_url= server.url, cache_dir= cache, ttl= 60, retries= 1, backoff= 0)
+        client.warm(fixtures)
+        expire(client, f"PublicHolidays/{CURRENT}/US")
+
+        assert client.get_public_holidays(CURRENT, "US") == recorded(fixtures, CURRENT)
+        assert server.requests == 2
+
+        # Without a copy to fall back to, the error reaches the caller
+        with pytest.raises(requests.RequestException):
+            client.get_public_holidays(PAST - 1, "US")
+
+def test_warm_requires_the_cache(fixtures):
+    with pytest.raises(ValueError):
+        NagerClient(cache_dir= None).warm(fixtures)
+
+def test_snapshot_when_the_countries_fail(fixtures, monkeypatch):
+    with FixtureServer(fixtures, status= 503) as server:
+        # Every client of the process uses the snapshot after the first failure, without retrying
+        for _ in range(3):
+            client = NagerClient(base_url= server.url, cache_dir= None, retries= 1, backoff= 0)
+            assert any(item["countryCode"] == "US" for item in client.get_available_countries())
+        assert server.requests == 2
+
+        monkeypatch.setattr(nager, "FALLBACK_SECONDS", 0)
+        NagerClient(base_url= server.url, cache_dir= None, retries= 1, backoff= 0).get_available_countries()
+        assert server.requests == 4
@@ -0,0 +1,89 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from SeasonalityScript import RuleProvider, SeasonalityScript, holiday_indicators, sparse_holiday_counts, week_bins
+
+def original_csv(df: pd.DataFrame, path: str, long_format: bool = False):
+    '''
+    Writes a joined DataFrame the way get_csv originally did: through a temporary csv file read back
+    without its headers, with the rows needed by the modeling tool concatenated on top.
+    '''
+    df = df.copy()
+    df["account"] = "national"
+    columns = list(df.columns)
+    df = df[columns[-1:] + columns[:-1]]
+    headers_row = np.array([list(df.columns)])
+
+    df.to_csv(path, index= False)
+    df = pd.read_csv(path, skiprows= [0], header= None)
+    headers_row = pd.DataFrame(headers_row, columns= df.columns, index= [0])
+    rows = [[None, None] + ["SUB"] * (len(df.columns) - 2) if r == 9 else ["Blank"] * len(df.columns) for r in range(10)]
+    df = pd.concat([pd.DataFrame(data= rows, columns= df.columns), pd.concat([headers_row, df], ignore_index= True)], ignore_index= True)
+    df = df.iloc[1:, :]
+
+    # The original took the long format headers from the 'SUB' row (iloc[8]) and failed, so the headers row is used instead
+    if long_format == True:
+        df.columns = list(df.iloc[9, :])
+        df = df.iloc[10:, 1:].melt(id_vars= "date", var_name= "series_name", value_name= "value")[["series_name", "date", "value"]]
+    df.to_csv(path, index= False, header= None)
+
+def read(path: str):
+    '''
+    :returns: bytes | content of a file.
+    '''
+    with open(path, "rb") as file:
+        return file.read()
+
+@pytest.mark.parametrize("country_code, uk_country", [("US", None), ("GB", "SCT")])
+@pytest.mark.parametrize("week_ending", [False, True])
+@pytest.mark.parametrize("long_format", [False, True])
+def test_csv_matches_the_original_writer(tmp_path, country_code, uk_country, week_ending, long_format):
+    data = SeasonalityScript(country_code, "17/03/2019", "02/11/2023", "WED", uk_country, week_ending, RuleProvider(), quiet= True)
+    data.get_csv(str(tmp_path), long_format)
+    original_csv(data.df, os.path.join(tmp_path, "original.csv"), long_format)
+
+    assert read(os.path.join(tmp_path, "Seasonality.csv")) == read(os.path.join(tmp_path, "original.csv"))
+
+def holidays_with_shared_names():
+    '''
+    :returns: dict | random dates for names that are the same once the punctuation is removed, some of them outside the test range.
+    '''
+    generator = np.random.default_rng(7)
+    names = ["New Year's Day", "Labour Day", "Labour, Day", "St. Stephen's Day", "St Stephens Day", "Day 1"]
+    return {name: list(pd.Timestamp("2018-06-01") + pd.to_timedelta(generator.integers(0, 1100, size= 4), unit= "D"))
+            for name in names}
+
+def test_holiday_indicators_match_the_daily_loop():
+    dates = pd.Series(pd.date_range("2018-12-20", "2021-01-10", freq= "D"), name= "date")
+    holidays = holidays_with_shared_names()
+
+    # The original loop: one pass over the days per holiday, where a later column with the same name replaces the earlier one
+    expected = pd.DataFrame(index= dates.index)
+    for (holiday, holiday_dates) in holidays.items():
+        column = [1 if day in holiday_dates else 0 for day in dates]
+        expected["Seasonality-" + holiday.replace("'", '').replace('.', '').replace(',', '')] = column
+
+    pd.testing.assert_frame_equal(holiday_indicators(dates, holidays), expected, check_dtype= False)
+
+def test_sparse_counts_match_the_indicators():
+    dates = pd.Series(pd.date_range("2018-12-20", "2021-01-10", freq= "D"), name= "date")
+    holidays = holidays_with_shared_names()
+    (labels, first, last) = week_bins(dates.iloc[0], dates.iloc[-1], "WED")
+
+    weeks = np.searchsorted(first, dates.to_numpy(dtype= "datetime64[D]"), side= "right") - 1
+    expected = holiday_indicators(dates, holidays).groupby(weeks).sum()
+    counts = sparse_holiday_counts(dates, holidays, "WED")
+
+    assert list(counts.columns) == ["date"] + list(expected.columns)
+    np.testing.assert_array_equal(counts.drop(columns= "date").sparse.to_dense().to_numpy(), expected.to_numpy())
+
+@pytest.mark.parametrize(("options", "dtype"), [({}, np.int64), ({"sparse": True}, np.uint8), ({"features": ["fourier"]}, np.float64),
+                                                ({"sparse": True, "features": ["fourier"]}, np.float64)])
+def test_matrix_dtype(options, dtype):
+    data = SeasonalityScript("US", "01/01/2021", "31/12/2022", "MON", client= RuleProvider(), quiet= True, **options)
+    (matrix, columns, dates) = data.build("matrix")
+    assert matrix.dtype == dtype
+    converted = data.build("matrix", dtype= np.float32)[0]
+    assert converted.dtype == np.float32
+    np.testing.assert_array_equal(converted, matrix.astype(np.float32))
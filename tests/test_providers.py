@@ -0,0 +1,50 @@
+import json
+import os
+import pytest
+from SeasonalityScript import NagerClient, RuleProvider
+
+def holidays(country_code: str, year: int):
+    '''
+    :returns: dict | date of every holiday of the bundled rules, by name.
+    '''
+    return {item["name"]: item["date"] for item in RuleProvider().get_public_holidays(year, country_code)}
+
+@pytest.mark.parametrize("year, name, day", [(2019, "Early May Bank Holiday", "2019-05-06"),
+                                             (2020, "Early May Bank Holiday", "2020-05-08"),
+                                             (2022, "Spring Bank Holiday", "2022-06-02"),
+                                             (2022, "Queen’s Platinum Jubilee", "2022-06-03"),
+                                             (2022, "Queen’s State Funeral", "2022-09-19"),
+                                             (2023, "Coronation Bank Holiday", "2023-05-08"),
+                                             (2023, "Spring Bank Holiday", "2023-05-29")])
+def test_moved_and_one_off_uk_holidays(year, name, day):
+    assert holidays("GB", year)[name] == day
+
+def test_one_off_uk_holidays_only_exist_once():
+    assert "Queen’s Platinum Jubilee" not in holidays("GB", 2023)
+    assert "Coronation Bank Holiday" not in holidays("GB", 2024)
+
+@pytest.mark.parametrize("year, day", [(2023, "2023-02-06"), (2025, "2025-02-03"), (2030, "2030-02-01")])
+def test_saint_brigids_day(year, day):
+    # First Monday of February, unless the 1st is a Friday
+    assert holidays("IE", year)["Saint Brigid's Day"] == day
+    assert "Saint Brigid's Day" not in holidays("IE", 2022)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIELDS = ["date", "name", "localName", "counties", "types", "global"]
+
+def fixture_years():
+    '''
+    :returns: list | (year, country code) of every recorded response in the fixtures.
+    '''
+    folder = os.path.join(FIXTURES, "PublicHolidays")
+    return [(int(year), name[:-len(".json")]) for year in sorted(os.listdir(folder)) for name in sorted(os.listdir(os.path.join(folder, year)))]
+
+@pytest.mark.parametrize("year, country_code", fixture_years())
+def test_rules_match_the_api(year, country_code):
+    # Same cache layout as NagerClient, so NagerClient(cache_dir= FIXTURES) records them again
+    recorded = NagerClient(cache_dir= FIXTURES, offline= True).get_public_holidays(year, country_code)
+    computed = RuleProvider().get_public_holidays(year, country_code)
+    project = lambda items: sorted(tuple(json.dumps(item[field]) for field in FIELDS) for item in items)
+
+    # The rules only include the national holidays and the regional ones of the UK countries
+    assert project(computed) == project(item for item in recorded if item["global"] or country_code == "GB")